@@ -102,7 +102,7 @@ X11_DISPLAY_CONFIG_FILE = CACHE_DIR / "x11_display.json"
 REMOTE_HOSTS_CONFIG_FILE = CACHE_DIR / "remote_hosts.json"
 PROFILE_ALIASES_FILE = CACHE_DIR / "profile_aliases.json"
 PRECHECK_STATUS_FILE = CACHE_DIR / "limit_precheck_status.json"
-PRECHECK_HISTORY_FILE = CACHE_DIR / "limit_precheck_history.json"
+PRECHECK_HISTORY_FILE = CACHE_DIR / "limit_precheck_history.jsonl"
 UPDATE_COUNTS_TS_FILE = CACHE_DIR / "update_counts_last_run.txt"
 UPDATE_COUNTS_SEEN_PATHS_FILE = CACHE_DIR / "update_counts_seen_paths.txt"
 UPDATE_COUNTS_CONFIG_FILE = CACHE_DIR / "update_counts_config.json"
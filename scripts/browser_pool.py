@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Browser Pool — one shared headed Chromium for profile logins.
+
+Launches a single Chromium with a CDP port and publishes its WebSocket
+endpoint, so login_profile.py can open a per-profile BrowserContext in it
+instead of starting its own Chromium (and Xvfb) for every login.
+
+Usage:
+    python scripts/browser_pool.py                 # CDP on port 9222
+    python scripts/browser_pool.py --port 9333     # Custom CDP port
+
+Must run under an X11 display (e.g. DISPLAY=:99 or xvfb-run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("browser_pool")
+
+CACHE_DIR = Path.home() / ".cache" / "ocr-dashboard-v3"
+# Written while the pool is up: {"ws_endpoint": ..., "pid": ...}
+POOL_ENDPOINT_FILE = CACHE_DIR / "browser_pool.json"
+POOL_USER_DATA_DIR = CACHE_DIR / "browser-pool-profile"
+
+DEFAULT_CDP_PORT = 9222
+CDP_READY_TIMEOUT = 15  # seconds
+
+CHROMIUM_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-infobars",
+    "--disable-crash-reporter",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-session-crashed-bubble",
+]
+
+
+def read_pool_endpoint() -> str | None:
+    """Return the CDP WebSocket endpoint of a running pool, or None."""
+    try:
+        data = json.loads(POOL_ENDPOINT_FILE.read_text(encoding="utf-8"))
+        os.kill(int(data["pid"]), 0)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return data.get("ws_endpoint") or None
+
+
+def _chromium_executable() -> str:
+    # Imported here: login_profile.py imports this module just for read_pool_endpoint()
+    from playwright.sync_api import sync_playwright  # noqa: PLC0415
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def _wait_for_ws_endpoint(port: int, proc: subprocess.Popen) -> str | None:
+    """Poll /json/version until Chromium exposes its browser WebSocket URL."""
+    deadline = time.time() + CDP_READY_TIMEOUT
+    delay = 0.05
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as r:
+                return json.loads(r.read())["webSocketDebuggerUrl"]
+        except (OSError, ValueError, KeyError):
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Chromium for profile logins")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_CDP_PORT,
+        help=f"Chromium remote debugging port (default: {DEFAULT_CDP_PORT})",
+    )
+    args = parser.parse_args()
+
+    if not os.environ.get("DISPLAY"):
+        logger.error("No DISPLAY set - start the pool under X11 or xvfb-run")
+        sys.exit(1)
+
+    if read_pool_endpoint():
+        logger.error(f"A browser pool is already running (see {POOL_ENDPOINT_FILE})")
+        sys.exit(1)
+
+    POOL_USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    proc = subprocess.Popen(
+        [
+            _chromium_executable(),
+            f"--remote-debugging-port={args.port}",
+            f"--user-data-dir={POOL_USER_DATA_DIR}",
+            *CHROMIUM_ARGS,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    ws_endpoint = _wait_for_ws_endpoint(args.port, proc)
+    if not ws_endpoint:
+        logger.error("❌ Chromium did not expose a CDP endpoint")
+        proc.terminate()
+        sys.exit(1)
+
+    POOL_ENDPOINT_FILE.write_text(
+        json.dumps({"ws_endpoint": ws_endpoint, "pid": proc.pid}), encoding="utf-8"
+    )
+    logger.info(f"✅ Browser pool ready: {ws_endpoint}")
+
+    def _shutdown(_signum, _frame):
+        proc.terminate()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    try:
+        proc.wait()
+    finally:
+        POOL_ENDPOINT_FILE.unlink(missing_ok=True)
+        logger.info("👋 Browser pool stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,10 +25,11 @@ import json
 import logging
 import os
 import signal
+import subprocess
 import sys
 import time
 from dataclasses import dataclass, field
-from datetime import UTC, datetime
+from http import HTTPStatus
 from pathlib import Path
 
 # Project root for relative paths
@@ -41,12 +42,26 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Keep-alive session for dashboard readiness probes
+_SESSION = requests.Session() if HAS_REQUESTS else None
+_HEALTH_HEAD_UNSUPPORTED = False
+
 # ---------------------------------------------------------------------------
 # Logging setup
 # ---------------------------------------------------------------------------
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Force a full /proc rescan every N cycles even when all known PIDs are alive
+FULL_SCAN_EVERY_CYCLES = 10
+
 
 def setup_logging(log_file: str | None = None, level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger("farm_conductor")
@@ -85,6 +100,13 @@ class FarmConfig:
     max_memory_percent: float = 85.0
     max_cpu_load_1m: float = 7.0
 
+    # Parsed from ``defaults`` by load_config()
+    auto_advance: bool = False
+    pg_enabled: bool = False
+    continuous: bool = False
+    windows: int | None = None
+    tabs_per_window: int | None = None
+
 
 @dataclass
 class ProfileState:
@@ -99,86 +121,180 @@ class ProfileState:
     total_restarts: int = 0
     last_error: str | None = None
     backoff_until: float = 0.0
+    _snapshot: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    def snapshot_dict(self) -> dict:
+        """Return the summary entry for this profile, rebuilt only when it changed."""
+        snap = self._snapshot
+        if (
+            snap is None
+            or snap["running"] != self.running
+            or snap["pids"] != self.pids
+            or snap["failures"] != self.consecutive_failures
+            or snap["restarts"] != self.total_restarts
+        ):
+            snap = self._snapshot = {
+                "running": self.running,
+                "pids": list(self.pids),
+                "failures": self.consecutive_failures,
+                "restarts": self.total_restarts,
+            }
+        return snap
 
 
 # ---------------------------------------------------------------------------
 # System monitoring
 # ---------------------------------------------------------------------------
+def _meminfo_kb(buf: bytes, key: bytes) -> int:
+    """Parse the kB value following ``key`` in a raw /proc/meminfo buffer."""
+    idx = buf.find(key)
+    if idx == -1:
+        return 0
+    start = idx + len(key)
+    end = buf.find(b"kB", start)
+    try:
+        return int(buf[start:end])
+    except ValueError:
+        return 0
+
+
 def get_memory_percent() -> float:
     """Get current memory usage as a percentage."""
     try:
-        with open("/proc/meminfo") as f:
-            meminfo = {}
-            for line in f:
-                parts = line.split(":")
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = int(parts[1].strip().split()[0])
-                    meminfo[key] = value
-            total = meminfo.get("MemTotal", 0)
-            available = meminfo.get("MemAvailable", 0)
-            if total > 0:
-                return round(100 * (total - available) / total, 1)
-    except Exception:
-        pass
+        fd = os.open("/proc/meminfo", os.O_RDONLY)
+        try:
+            # MemTotal / MemAvailable are always in the first few lines
+            buf = os.read(fd, 2048)
+        finally:
+            os.close(fd)
+    except OSError:
+        return 0.0
+    total = _meminfo_kb(buf, b"MemTotal:")
+    available = _meminfo_kb(buf, b"MemAvailable:")
+    if total > 0:
+        return round(100 * (total - available) / total, 1)
     return 0.0
 
 
 def get_cpu_load_1m() -> float:
     """Get 1-minute load average."""
     try:
-        with open("/proc/loadavg") as f:
-            return float(f.read().split()[0])
-    except Exception:
+        return round(os.getloadavg()[0], 2)
+    except OSError:
         return 0.0
 
 
+def sample_resources() -> tuple[float, float]:
+    """Sample memory usage percent and 1-minute load average in one call."""
+    return get_memory_percent(), get_cpu_load_1m()
+
+
+# Leading NUL anchors the match to the start of an environment entry
+_PROFILE_ENV_NEEDLE = b"\x00OCR_PROFILE_SUFFIX="
+_ENVIRON_CHUNK = 8192
+
+
+def _read_profile_suffix(proc_dir: str) -> str | None:
+    """Extract OCR_PROFILE_SUFFIX from a process environment.
+
+    Reads environ in chunks and stops as soon as the variable is complete, so
+    large environments are not read in full.
+    """
+    try:
+        with Path(proc_dir, "environ").open("rb") as f:
+            data = b"\x00" + f.read(_ENVIRON_CHUNK)
+            idx = data.find(_PROFILE_ENV_NEEDLE)
+            # Keep reading until the key and its terminating NUL are buffered
+            while idx == -1 or data.find(b"\x00", idx + 1) == -1:
+                more = f.read(_ENVIRON_CHUNK)
+                if not more:
+                    break
+                if idx == -1:
+                    data = data[-len(_PROFILE_ENV_NEEDLE) :] + more
+                    idx = data.find(_PROFILE_ENV_NEEDLE)
+                else:
+                    data += more
+    except Exception:
+        return None
+
+    if idx == -1:
+        return None
+    start = idx + len(_PROFILE_ENV_NEEDLE)
+    end = data.find(b"\x00", start)
+    value = data[start:] if end == -1 else data[start:end]
+    return value.decode("utf-8", "ignore")
+
+
+def _pgrep_run_py() -> list[int] | None:
+    """List PIDs whose cmdline contains run.py using pgrep.
+
+    Returns None when pgrep is unavailable so callers can fall back to /proc.
+    """
+    try:
+        result = subprocess.run(
+            ["pgrep", "-f", "run.py"],
+            capture_output=True,
+            check=False,
+            timeout=5,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    # Exit code 1 means "no match", anything above is a pgrep error
+    if result.returncode > 1:
+        return None
+    return [int(line) for line in result.stdout.split() if line.isdigit()]
+
+
 def get_running_profiles() -> dict[str, list[int]]:
     """Scan /proc for running run.py processes grouped by profile."""
     profiles: dict[str, list[int]] = {}
-    proc_root = Path("/proc")
 
-    if not proc_root.exists():
+    if not Path("/proc").is_dir():
         return profiles
 
-    for entry in proc_root.iterdir():
-        if not entry.name.isdigit():
-            continue
-        pid = int(entry.name)
-        try:
-            # Skip zombies
-            stat_path = entry / "stat"
-            if stat_path.exists():
+    # Fast path: let pgrep find candidates, then only read their environments
+    pids = _pgrep_run_py()
+    if pids is not None:
+        for pid in pids:
+            profile = _read_profile_suffix(f"/proc/{pid}")
+            if profile:
+                profiles.setdefault(profile, []).append(pid)
+        return profiles
+
+    with os.scandir("/proc") as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            base = entry.path
+            try:
+                # Skip zombies (a vanished PID simply counts as non-zombie here)
                 try:
-                    state = stat_path.read_text(encoding="utf-8", errors="ignore").split()[2]
-                    if state == "Z":
-                        continue
-                except Exception:
+                    with Path(base, "stat").open(encoding="utf-8", errors="ignore") as f:
+                        if f.read().split()[2] == "Z":
+                            continue
+                except (OSError, IndexError):
                     pass
 
-            cmdline = (entry / "cmdline").read_bytes()
-            if b"run.py" not in cmdline:
-                continue
+                with Path(base, "cmdline").open("rb") as f:
+                    if b"run.py" not in f.read():
+                        continue
 
-            # Extract profile suffix from environment
-            profile = None
-            try:
-                env_bytes = (entry / "environ").read_bytes()
-                for item in env_bytes.split(b"\x00"):
-                    if item.startswith(b"OCR_PROFILE_SUFFIX="):
-                        profile = item.split(b"=", 1)[1].decode("utf-8", "ignore")
-                        break
+                # Extract profile suffix from environment
+                profile = _read_profile_suffix(base)
+                if profile:
+                    profiles.setdefault(profile, []).append(pid)
             except Exception:
-                pass
-
-            if profile:
-                profiles.setdefault(profile, []).append(pid)
-        except Exception:
-            continue
+                continue
 
     return profiles
 
 
+def pids_alive(pids: list[int]) -> bool:
+    """Return True if every PID in the list still has a /proc entry."""
+    return bool(pids) and all(Path(f"/proc/{pid}").exists() for pid in pids)
+
+
 # ---------------------------------------------------------------------------
 # Dashboard API interaction
 # ---------------------------------------------------------------------------
@@ -209,13 +325,24 @@ def api_start_profile(
         return False, f"API error: {str(e)[:100]}"
 
 
-def api_check_dashboard(dashboard_url: str, timeout: int = 5) -> bool:
-    """Check if the dashboard API is responding."""
+def api_check_dashboard(dashboard_url: str, timeout: int = 2) -> bool:
+    """Check if the dashboard API is responding.
+
+    Probes the lightweight /api/health endpoint with HEAD. Servers that reject
+    HEAD (405) are remembered and probed with GET from then on.
+    """
+    global _HEALTH_HEAD_UNSUPPORTED  # noqa: PLW0603
     if not HAS_REQUESTS:
         return False
+    url = f"{dashboard_url}/api/health"
     try:
-        resp = requests.get(f"{dashboard_url}/api/profiles", timeout=timeout)
-        return 200 <= resp.status_code < 300
+        if not _HEALTH_HEAD_UNSUPPORTED:
+            resp = _SESSION.head(url, timeout=timeout)
+            if resp.status_code != HTTPStatus.METHOD_NOT_ALLOWED:
+                return resp.ok
+            _HEALTH_HEAD_UNSUPPORTED = True
+        resp = _SESSION.get(url, timeout=timeout)
+        return resp.ok
     except Exception:
         return False
 
@@ -245,14 +372,23 @@ class FarmConductor:
 
         self._shutdown = False
 
+        # Last /proc scan result, reused while every managed profile stays alive
+        self._running_cache: dict[str, list[int]] = {}
+        self._cycles_since_scan = 0
+
+        # Start payload depends only on the (immutable) config, build it once
+        self._profile_config = self._build_profile_config()
+
+        # Most recent successful start across all profiles (stagger check)
+        self._last_start_any = 0.0
+
     def _signal_handler(self, signum, frame):
         self.log.info("🛑 Shutdown signal received (sig=%s). Stopping conductor...", signum)
         self._shutdown = True
 
     def _check_resources(self) -> tuple[bool, str]:
         """Check if system resources allow starting more profiles."""
-        mem_pct = get_memory_percent()
-        cpu_load = get_cpu_load_1m()
+        mem_pct, cpu_load = sample_resources()
 
         if mem_pct > self.config.max_memory_percent:
             return False, f"Memory too high: {mem_pct}% > {self.config.max_memory_percent}%"
@@ -268,32 +404,86 @@ class FarmConductor:
 
     def _build_profile_config(self) -> dict:
         """Build the config dict for profile start API call."""
-        defaults = self.config.defaults.copy()
+        cfg = self.config
         config: dict = {}
 
-        if defaults.get("auto_advance"):
+        if cfg.auto_advance:
             config["auto_advance"] = True
-        if defaults.get("pg_enabled"):
+        if cfg.pg_enabled:
             config["pg_enabled"] = True
-        if defaults.get("continuous"):
+        if cfg.continuous:
             config["continuous_mode"] = True
+        if cfg.windows:
+            config["windows"] = cfg.windows
+        if cfg.tabs_per_window:
+            config["tabs_per_window"] = cfg.tabs_per_window
 
-        windows = defaults.get("windows")
-        if windows:
-            config["windows"] = windows
+        return config
 
-        tabs = defaults.get("tabs_per_window")
-        if tabs:
-            config["tabs_per_window"] = tabs
+    def _get_running(self) -> dict[str, list[int]]:
+        """Return running profiles, skipping the /proc walk when nothing changed.
+
+        The full scan is only needed when a managed profile may have died (or was
+        never seen). While every known PID is still alive, the cached mapping is
+        reused, with a periodic full rescan to correct drift.
+        """
+        self._cycles_since_scan += 1
+        if self._cycles_since_scan < FULL_SCAN_EVERY_CYCLES and all(
+            pids_alive(self._running_cache.get(name, [])) for name in self.states
+        ):
+            return self._running_cache
+
+        self._running_cache = get_running_profiles()
+        self._cycles_since_scan = 0
+        return self._running_cache
+
+    def _start_blocker(
+        self, name: str, state: ProfileState, now: float, running_count: int
+    ) -> dict | None:
+        """Return the skip action that keeps a stopped profile from starting, if any."""
+        # Check backoff
+        if now < state.backoff_until:
+            wait_remaining = int(state.backoff_until - now)
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug("⏳ [%s] In backoff period (%ds remaining)", name, wait_remaining)
+            return {"profile": name, "action": "backoff", "wait_s": wait_remaining}
 
-        return config
+        # Check max concurrent
+        if running_count >= self.config.max_concurrent:
+            self.log.info(
+                "⚠️ [%s] Skipping start: max_concurrent=%d reached (%d running)",
+                name,
+                self.config.max_concurrent,
+                running_count,
+            )
+            return {"profile": name, "action": "skip_max_concurrent"}
+
+        # Check resources
+        res_ok, res_msg = self._check_resources()
+        if not res_ok:
+            self.log.warning("⚠️ [%s] Skipping start: %s", name, res_msg)
+            return {"profile": name, "action": "skip_resources", "reason": res_msg}
+
+        # Check staggered startup delay (don't start all at once)
+        if (
+            now - self._last_start_any < self.config.startup_delay_sec
+            and state.consecutive_failures == 0
+        ):
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug(
+                    "⏳ [%s] Stagger delay: %ds since last start",
+                    name,
+                    int(now - self._last_start_any),
+                )
+            return {"profile": name, "action": "stagger_wait"}
+        return None
 
     def run_cycle(self) -> dict:
         """Execute one monitoring/management cycle. Returns status summary."""
         now = time.time()
-        running = get_running_profiles()
+        running = self._get_running()
         summary = {
-            "time": datetime.now(UTC).isoformat(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
             "profiles": {},
             "actions": [],
         }
@@ -303,12 +493,7 @@ class FarmConductor:
             pids = running.get(name, [])
             state.pids = pids
             state.running = len(pids) > 0
-            summary["profiles"][name] = {
-                "running": state.running,
-                "pids": pids,
-                "failures": state.consecutive_failures,
-                "restarts": state.total_restarts,
-            }
+            summary["profiles"][name] = state.snapshot_dict()
 
         # Count running profiles
         running_count = sum(1 for s in self.states.values() if s.running)
@@ -327,51 +512,9 @@ class FarmConductor:
                 continue
 
             # Profile is NOT running — should we (re)start it?
-
-            # Check backoff
-            if now < state.backoff_until:
-                wait_remaining = int(state.backoff_until - now)
-                self.log.debug("⏳ [%s] In backoff period (%ds remaining)", name, wait_remaining)
-                summary["actions"].append(
-                    {"profile": name, "action": "backoff", "wait_s": wait_remaining}
-                )
-                continue
-
-            # Check max concurrent
-            if running_count >= self.config.max_concurrent:
-                self.log.info(
-                    "⚠️ [%s] Skipping start: max_concurrent=%d reached (%d running)",
-                    name,
-                    self.config.max_concurrent,
-                    running_count,
-                )
-                summary["actions"].append({"profile": name, "action": "skip_max_concurrent"})
-                continue
-
-            # Check resources
-            res_ok, res_msg = self._check_resources()
-            if not res_ok:
-                self.log.warning("⚠️ [%s] Skipping start: %s", name, res_msg)
-                summary["actions"].append(
-                    {"profile": name, "action": "skip_resources", "reason": res_msg}
-                )
-                continue
-
-            # Check staggered startup delay (don't start all at once)
-            last_start_any = max(
-                (s.last_start_time for s in self.states.values()),
-                default=0,
-            )
-            if (
-                now - last_start_any < self.config.startup_delay_sec
-                and state.consecutive_failures == 0
-            ):
-                self.log.debug(
-                    "⏳ [%s] Stagger delay: %ds since last start",
-                    name,
-                    int(now - last_start_any),
-                )
-                summary["actions"].append({"profile": name, "action": "stagger_wait"})
+            skip = self._start_blocker(name, state, now, running_count)
+            if skip:
+                summary["actions"].append(skip)
                 continue
 
             # START the profile
@@ -382,7 +525,7 @@ class FarmConductor:
                 summary["actions"].append({"profile": name, "action": f"dry_run_{action_type}"})
                 continue
 
-            profile_config = self._build_profile_config()
+            profile_config = self._profile_config
             self.log.info(
                 "🚀 [%s] %s profile (failures=%d, restarts=%d)...",
                 name,
@@ -395,6 +538,7 @@ class FarmConductor:
 
             if success:
                 state.last_start_time = now
+                self._last_start_any = now
                 state.total_restarts += 1
                 running_count += 1
                 self.log.info("✅ [%s] Started: %s", name, message)
@@ -494,9 +638,10 @@ def load_config(config_path: str | Path) -> FarmConfig:
     with open(path, encoding="utf-8") as f:
         data = json.load(f)
 
+    defaults = data.get("defaults", {})
     return FarmConfig(
         profiles=data.get("profiles", []),
-        defaults=data.get("defaults", {}),
+        defaults=defaults,
         max_concurrent=data.get("max_concurrent", 4),
         startup_delay_sec=data.get("startup_delay_sec", 30),
         restart_backoff_base_sec=data.get("restart_backoff_base_sec", 10),
@@ -504,9 +649,23 @@ def load_config(config_path: str | Path) -> FarmConfig:
         health_check_interval_sec=data.get("health_check_interval_sec", 30),
         max_memory_percent=data.get("max_memory_percent", 85.0),
         max_cpu_load_1m=data.get("max_cpu_load_1m", 7.0),
+        auto_advance=bool(defaults.get("auto_advance")),
+        pg_enabled=bool(defaults.get("pg_enabled")),
+        continuous=bool(defaults.get("continuous")),
+        windows=defaults.get("windows") or None,
+        tabs_per_window=defaults.get("tabs_per_window") or None,
     )
 
 
+def dump_summary(summary: dict) -> str:
+    """Serialize a cycle summary as indented JSON (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.dumps(
+            summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS, default=str
+        ).decode("utf-8")
+    return json.dumps(summary, indent=2, default=str)
+
+
 # ---------------------------------------------------------------------------
 # CLI entry point
 # ---------------------------------------------------------------------------
@@ -563,7 +722,7 @@ def main() -> int:
 
     if args.once:
         summary = conductor.run_cycle()
-        logger.info("Summary: %s", json.dumps(summary, indent=2, default=str))
+        logger.info("Summary: %s", dump_summary(summary))
         return 0
 
     conductor.run_loop()
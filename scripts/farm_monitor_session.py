@@ -7,305 +7,498 @@ Exits early if last profile shows no activity for 3 minutes.
 
 import json
 import os
+import signal
 import sys
+import threading
 import time
+from collections import deque
 from datetime import UTC, datetime
 from pathlib import Path
 
+try:
+    import ahocorasick
+
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 MAX_DURATION = 600  # 10 minutes
 INACTIVITY_TIMEOUT = 180  # 3 minutes
 CHECK_INTERVAL = 15  # check every 15 seconds
+MAX_CHECK_INTERVAL = 60  # idle backoff ceiling
+IDLE_TICKS_BEFORE_BACKOFF = 3
 
 PROJECT_ROOT = Path(__file__).parent.parent
 LOG_DIR = PROJECT_ROOT / "logs" / "profiles"
 
+PAGE_SIZE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+# meminfo/loadavg snapshot refreshed by the background poller
+SYS_POLL_INTERVAL = 10
+_sys_cache = {"mem": {}, "load": {}, "ts": 0}
+_sys_lock = threading.Lock()
+
 
-def get_profile_status(name):
-    """Check profile process status via /proc."""
-    proc_root = Path("/proc")
-    pids = []
-    for entry in proc_root.iterdir():
+def scan_proc_once():
+    """Walk /proc once and aggregate run.py PIDs and memory per profile.
+
+    Returns ``{profile: {"pids": [...], "rss_kb": int, "pss_kb": int}}``; memory
+    is read while the PID's entry is being visited so no second walk is needed.
+    """
+    proc_map = {}
+    for entry in Path("/proc").iterdir():
         if not entry.name.isdigit():
             continue
         try:
             cmdline = (entry / "cmdline").read_bytes()
             if b"run.py" not in cmdline:
                 continue
-            env_bytes = (entry / "environ").read_bytes()
-            for item in env_bytes.split(b"\x00"):
-                if item.startswith(b"OCR_PROFILE_SUFFIX="):
-                    profile = item.split(b"=", 1)[1].decode("utf-8", "ignore")
-                    if profile == name:
-                        pids.append(int(entry.name))
-                    break
+            env = dict(
+                item.split(b"=", 1)
+                for item in (entry / "environ").read_bytes().split(b"\x00")
+                if b"=" in item
+            )
+            profile = env.get(b"OCR_PROFILE_SUFFIX")
+            if profile:
+                pid = int(entry.name)
+                rss, pss = rss_pss(pid)
+                agg = proc_map.setdefault(
+                    profile.decode("utf-8", "ignore"), {"pids": [], "rss_kb": 0, "pss_kb": 0}
+                )
+                agg["pids"].append(pid)
+                agg["rss_kb"] += rss
+                agg["pss_kb"] += pss
         except Exception:
             continue
-    return pids
+    return proc_map
 
 
-def get_log_info(name):
-    """Get log file info for a profile."""
-    log_file = LOG_DIR / f"{name}.log"
-    if not log_file.exists():
-        return {"exists": False, "size": 0, "last_modified": None, "tail": ""}
-
-    stat = log_file.stat()
-    try:
-        with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-            lines = content.strip().split("\n")
-            tail = "\n".join(lines[-30:]) if lines else ""
-    except Exception as e:
-        tail = f"Error reading: {e}"
-
-    return {
-        "exists": True,
-        "size": stat.st_size,
-        "last_modified": datetime.fromtimestamp(stat.st_mtime, UTC).isoformat(),
-        "tail": tail,
-        "total_lines": len(lines) if "lines" in dir() else 0,
-    }
-
+def _meminfo_kb(buf, key):
+    """Parse the kB value after ``key`` in a raw /proc meminfo-style buffer."""
+    idx = buf.find(key)
+    if idx == -1:
+        return 0
+    start = idx + len(key)
+    return int(buf[start : buf.find(b"\n", start)].split()[0])
 
-def get_system_metrics():
-    """Collect system metrics."""
-    metrics = {}
 
-    # Memory
+def _sample_sys(meminfo_fd, loadavg_fd):
+    """Read meminfo/loadavg through already-open descriptors into _sys_cache."""
+    mem = {}
     try:
-        with open("/proc/meminfo") as f:
-            meminfo = {}
-            for line in f:
-                parts = line.split(":")
-                if len(parts) == 2:
-                    key = parts[0].strip()
-                    value = int(parts[1].strip().split()[0])
-                    meminfo[key] = value
-            total = meminfo.get("MemTotal", 0)
-            available = meminfo.get("MemAvailable", 0)
-            if total > 0:
-                used = total - available
-                metrics["mem_used_mb"] = round(used / 1024)
-                metrics["mem_total_mb"] = round(total / 1024)
-                metrics["mem_pct"] = round(100 * used / total, 1)
+        # MemTotal and MemAvailable are always within the first few lines
+        buf = os.pread(meminfo_fd, 512, 0)
+        total = _meminfo_kb(buf, b"MemTotal:")
+        available = _meminfo_kb(buf, b"MemAvailable:")
+        if total > 0:
+            used = total - available
+            mem["mem_used_mb"] = round(used / 1024)
+            mem["mem_total_mb"] = round(total / 1024)
+            mem["mem_pct"] = round(100 * used / total, 1)
     except Exception:
         pass
 
-    # CPU load
+    load = {}
     try:
-        with open("/proc/loadavg") as f:
-            parts = f.read().split()
-            metrics["load_1m"] = float(parts[0])
-            metrics["load_5m"] = float(parts[1])
+        parts = os.pread(loadavg_fd, 256, 0).split()
+        load["load_1m"] = float(parts[0])
+        load["load_5m"] = float(parts[1])
     except Exception:
         pass
 
-    # Per-profile memory (RSS)
+    with _sys_lock:
+        _sys_cache["mem"] = mem
+        _sys_cache["load"] = load
+        _sys_cache["ts"] = time.time()
+
+
+def _poll_sys(meminfo_fd, loadavg_fd):
+    while True:
+        time.sleep(SYS_POLL_INTERVAL)
+        _sample_sys(meminfo_fd, loadavg_fd)
+
+
+def start_sys_poller():
+    """Take a first meminfo/loadavg sample, then keep refreshing it in the background.
+
+    The descriptors stay open for the lifetime of the process so each refresh
+    is a single pread instead of an open/read/close cycle.
+    """
+    try:
+        meminfo_fd = os.open("/proc/meminfo", os.O_RDONLY)
+        loadavg_fd = os.open("/proc/loadavg", os.O_RDONLY)
+    except OSError:
+        return
+    _sample_sys(meminfo_fd, loadavg_fd)
+    threading.Thread(target=_poll_sys, args=(meminfo_fd, loadavg_fd), daemon=True).start()
+
+
+def rss_pss(pid):
+    """Return ``(rss_kb, pss_kb)`` for a PID.
+
+    smaps_rollup is summed once by the kernel, so this is a single small read
+    instead of walking per-mapping smaps text. Kernels without it (< 4.14)
+    fall back to statm, where PSS is reported equal to RSS.
+    """
+    try:
+        fd = os.open(f"/proc/{pid}/smaps_rollup", os.O_RDONLY)
+    except FileNotFoundError:
+        if not Path(f"/proc/{pid}").exists():
+            raise
+        with Path(f"/proc/{pid}/statm").open("rb") as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE_KB
+        return rss, rss
+    try:
+        buf = os.pread(fd, 2048, 0)
+    finally:
+        os.close(fd)
+    return _meminfo_kb(buf, b"\nRss:"), _meminfo_kb(buf, b"\nPss:")
+
+
+def get_system_metrics(proc_map):
+    """Collect system metrics."""
+    with _sys_lock:
+        metrics = {**_sys_cache["mem"], **_sys_cache["load"]}
+
+    # Per-profile memory (RSS/PSS), already aggregated by scan_proc_once()
     for name in PROFILES:
-        pids = get_profile_status(name)
-        total_rss = 0
-        for pid in pids:
-            try:
-                with open(f"/proc/{pid}/status") as f:
-                    for line in f:
-                        if line.startswith("VmRSS:"):
-                            total_rss += int(line.split()[1])
-                            break
-            except Exception:
-                pass
-        if pids:
-            metrics[f"rss_{name}_mb"] = round(total_rss / 1024)
+        agg = proc_map.get(name)
+        if agg:
+            metrics[f"rss_{name}_mb"] = round(agg["rss_kb"] / 1024)
+            metrics[f"pss_{name}_mb"] = round(agg["pss_kb"] / 1024)
 
     return metrics
 
 
-def count_errors_in_log(name):
-    """Count error-related lines in profile log."""
-    log_file = LOG_DIR / f"{name}.log"
-    if not log_file.exists():
-        return {"errors": 0, "warnings": 0, "critical": 0, "recent_errors": []}
+# Lowercased byte needles for single-pass log classification
+ERROR_NEEDLES = (b"error", b"exception", b"traceback")
+WARNING_NEEDLES = (b"warning", b"warn")
+CRITICAL_NEEDLES = (b"critical", b"fatal")
+PROMPT_NEEDLE = b"prompt sent"
 
-    errors = 0
-    warnings = 0
-    critical = 0
-    recent_errors = []
+TAIL_LINES = 30
+# First scans of large existing logs are read in bounded binary chunks
+LOG_READ_CHUNK = 1 << 20
+RECENT_ERRORS = 10
+
+# Incremental per-profile log state, keyed by profile name
+PROFILE_STATE = {}
 
-    try:
-        with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                line_lower = line.lower()
-                if "error" in line_lower or "exception" in line_lower or "traceback" in line_lower:
-                    errors += 1
-                    recent_errors.append(line.strip()[:200])
-                    recent_errors = recent_errors[-10:]  # keep last 10
-                elif "warning" in line_lower or "warn" in line_lower:
-                    warnings += 1
-                elif "critical" in line_lower or "fatal" in line_lower:
-                    critical += 1
-    except Exception:
-        pass
 
+def _new_log_state():
     return {
-        "errors": errors,
-        "warnings": warnings,
-        "critical": critical,
-        "recent_errors": recent_errors,
+        "exists": False,
+        "offset": 0,
+        "size": 0,
+        "growth": 0,
+        "total_lines": 0,
+        "errors": 0,
+        "warnings": 0,
+        "critical": 0,
+        "prompts": 0,
+        "tail": deque(maxlen=TAIL_LINES),
+        "recent_errors": deque(maxlen=RECENT_ERRORS),
     }
 
 
-def check_log_growth(name, prev_sizes):
-    """Check if log file is growing (activity indicator)."""
+def _build_log_automaton():
+    """Aho-Corasick automaton matching every log needle in a single pass."""
+    automaton = ahocorasick.Automaton()
+    for category, needles in (
+        ("error", ERROR_NEEDLES),
+        ("warning", WARNING_NEEDLES),
+        ("critical", CRITICAL_NEEDLES),
+        ("prompt", (PROMPT_NEEDLE,)),
+    ):
+        for needle in needles:
+            # latin-1 maps bytes 1:1 to code points, so match offsets stay byte offsets
+            automaton.add_word(needle.decode("latin-1"), category)
+    automaton.make_automaton()
+    return automaton
+
+
+LOG_AUTOMATON = _build_log_automaton() if HAS_AHOCORASICK else None
+# A line counts once, in the first matching category (errors beat warnings, etc.)
+_CATEGORY_RANK = {"error": 0, "warning": 1, "critical": 2}
+_CATEGORY_COUNTER = {"error": "errors", "warning": "warnings", "critical": "critical"}
+
+
+def _scan_log_lines_automaton(state, data):
+    """Classify lines with one automaton pass over the lowercased chunk."""
+    text = data.lower().decode("latin-1")
+    line_category = {}
+    prompt_lines = set()
+    for end, category in LOG_AUTOMATON.iter(text):
+        line_start = text.rfind("\n", 0, end) + 1
+        if category == "prompt":
+            prompt_lines.add(line_start)
+            continue
+        current = line_category.get(line_start)
+        if current is None or _CATEGORY_RANK[category] < _CATEGORY_RANK[current]:
+            line_category[line_start] = category
+
+    for line_start in sorted(line_category):
+        category = line_category[line_start]
+        state[_CATEGORY_COUNTER[category]] += 1
+        if category == "error":
+            line_end = data.find(b"\n", line_start)
+            raw = data[line_start : line_end if line_end != -1 else None]
+            state["recent_errors"].append(raw.strip()[:200].decode("utf-8", "ignore"))
+    state["prompts"] += len(prompt_lines)
+
+    # Only the last TAIL_LINES lines are kept, so locate them from the end
+    pos = len(data) - 1
+    for _ in range(TAIL_LINES):
+        pos = data.rfind(b"\n", 0, pos)
+        if pos == -1:
+            break
+    state["tail"].extend(line.decode("utf-8", "ignore") for line in data[pos + 1 :].splitlines())
+
+
+def _scan_log_lines(state, data):
+    """Classify complete log lines and update counters, tail and recent errors."""
+    if LOG_AUTOMATON is not None:
+        _scan_log_lines_automaton(state, data)
+        return
+    for raw in data.splitlines():
+        lower = raw.lower()
+        if any(n in lower for n in ERROR_NEEDLES):
+            state["errors"] += 1
+            state["recent_errors"].append(raw.strip()[:200].decode("utf-8", "ignore"))
+        elif any(n in lower for n in WARNING_NEEDLES):
+            state["warnings"] += 1
+        elif any(n in lower for n in CRITICAL_NEEDLES):
+            state["critical"] += 1
+        if PROMPT_NEEDLE in lower:
+            state["prompts"] += 1
+        state["tail"].append(raw.decode("utf-8", "ignore"))
+
+
+def update_log_state(name):
+    """Read only the bytes appended to a profile log since the previous check.
+
+    Tail capture, error/warning/critical counting and "Prompt sent" counting
+    happen in one pass over the new data. A shrinking file is treated as a
+    rotation and rescanned from the start.
+    """
+    state = PROFILE_STATE.get(name) or _new_log_state()
+    PROFILE_STATE[name] = state
     log_file = LOG_DIR / f"{name}.log"
-    current_size = log_file.stat().st_size if log_file.exists() else 0
-    prev_size = prev_sizes.get(name, 0)
-    prev_sizes[name] = current_size
-    return current_size > prev_size, current_size - prev_size
 
-
-def check_prompts_sent(name):
-    """Count 'Prompt sent' occurrences in log."""
-    log_file = LOG_DIR / f"{name}.log"
-    if not log_file.exists():
-        return 0
-    count = 0
     try:
-        with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if "Prompt sent" in line or "prompt sent" in line:
-                    count += 1
-    except Exception:
-        pass
-    return count
+        size = log_file.stat().st_size
+    except OSError:
+        state = PROFILE_STATE[name] = _new_log_state()
+        return state
+
+    prev_size = state["size"]
+    if size < state["offset"]:
+        state = PROFILE_STATE[name] = _new_log_state()
+    state["exists"] = True
+    state["size"] = size
+    state["growth"] = size - prev_size
+
+    if size > state["offset"]:
+        try:
+            with log_file.open("rb", buffering=LOG_READ_CHUNK) as f:
+                f.seek(state["offset"])
+                remaining = size - state["offset"]
+                pending = b""
+                while remaining > 0:
+                    data = f.read(min(LOG_READ_CHUNK, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    data = pending + data
+                    # Only consume complete lines; a partial last line is re-read next time
+                    end = data.rfind(b"\n")
+                    if end == -1:
+                        pending = data
+                        continue
+                    chunk = data[: end + 1]
+                    pending = data[end + 1 :]
+                    state["total_lines"] += chunk.count(b"\n")
+                    _scan_log_lines(state, chunk)
+                    state["offset"] += end + 1
+        except OSError:
+            return state
+
+    return state
 
 
 PROFILES = ["1985chauhongtrang", "2014edyta"]
 
 
+def _exit_on_sigterm(signum, _frame):
+    # Ignore repeated signals so they cannot interrupt closing the report
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.exit(128 + signum)
+
+
 def main():
     start_time = time.time()
-    prev_sizes = {}
     last_activity_time = start_time
     check_num = 0
-    all_snapshots = []
+    # Snapshots are streamed to disk; only what the final summary needs stays in memory
+    first_snapshot = last_snapshot = None
+    ever_running = set()
+    interval = CHECK_INTERVAL
+    idle_ticks = 0
+    next_tick = start_time
+
+    start_sys_poller()
+
+    report_file = PROJECT_ROOT / "logs" / "farm_monitor_report.jsonl"
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    report = report_file.open("w", buffering=1 << 16)
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
 
     print(f"=== Farm Monitor Session Started at {datetime.now(UTC).isoformat()} ===")
     print(f"Monitoring profiles: {PROFILES}")
     print(f"Max duration: {MAX_DURATION}s, Inactivity timeout: {INACTIVITY_TIMEOUT}s")
     print("=" * 80)
 
-    while True:
-        elapsed = time.time() - start_time
-        if elapsed >= MAX_DURATION:
-            print(f"\n>>> Duration limit reached ({MAX_DURATION}s). Stopping.")
-            break
-
-        inactive_time = time.time() - last_activity_time
-        if inactive_time >= INACTIVITY_TIMEOUT and check_num > 2:
-            print(f"\n>>> No activity detected for {int(inactive_time)}s. Early exit.")
-            break
-
-        check_num += 1
-        now = datetime.now(UTC).isoformat()
-        snapshot = {"check": check_num, "time": now, "elapsed_s": round(elapsed)}
-
-        print(f"\n--- Check #{check_num} | Elapsed: {int(elapsed)}s | {now} ---")
-
-        any_activity = False
-
-        for name in PROFILES:
-            pids = get_profile_status(name)
-            log_info = get_log_info(name)
-            growing, growth = check_log_growth(name, prev_sizes)
-            error_info = count_errors_in_log(name)
-            prompts = check_prompts_sent(name)
-
-            if growing:
-                any_activity = True
-                last_activity_time = time.time()
-
-            profile_data = {
-                "name": name,
-                "running": len(pids) > 0,
-                "pids": pids,
-                "log_size": log_info.get("size", 0),
-                "log_growth_bytes": growth,
-                "log_growing": growing,
-                "errors": error_info["errors"],
-                "warnings": error_info["warnings"],
-                "prompts_sent": prompts,
-            }
-            snapshot[name] = profile_data
-
-            status = "🟢 RUNNING" if pids else "🔴 STOPPED"
-            print(f"  [{name}] {status} PIDs={pids}")
-            print(f"    Log: {log_info.get('size', 0)} bytes, Growing: {growing} (+{growth}b)")
+    # Ctrl-C and SIGTERM both unwind through the finally, which flushes the report
+    try:
+        while True:
+            tick_start = time.time()
+            elapsed = tick_start - start_time
+            if elapsed >= MAX_DURATION:
+                print(f"\n>>> Duration limit reached ({MAX_DURATION}s). Stopping.")
+                break
+
+            inactive_time = time.time() - last_activity_time
+            if inactive_time >= INACTIVITY_TIMEOUT and check_num > 2:
+                print(f"\n>>> No activity detected for {int(inactive_time)}s. Early exit.")
+                break
+
+            check_num += 1
+            now = datetime.now(UTC).isoformat()
+            snapshot = {"check": check_num, "time": now, "elapsed_s": round(elapsed)}
+
+            print(f"\n--- Check #{check_num} | Elapsed: {int(elapsed)}s | {now} ---")
+
+            any_activity = False
+            proc_map = scan_proc_once()
+
+            for name in PROFILES:
+                pids = proc_map.get(name, {}).get("pids", [])
+                log_state = update_log_state(name)
+                growth = log_state["growth"]
+                growing = growth > 0
+
+                if growing:
+                    any_activity = True
+                    last_activity_time = time.time()
+
+                profile_data = {
+                    "name": name,
+                    "running": len(pids) > 0,
+                    "pids": pids,
+                    "log_size": log_state["size"],
+                    "log_growth_bytes": growth,
+                    "log_growing": growing,
+                    "log_lines": log_state["total_lines"],
+                    "errors": log_state["errors"],
+                    "warnings": log_state["warnings"],
+                    "prompts_sent": log_state["prompts"],
+                }
+                snapshot[name] = profile_data
+
+                status = "🟢 RUNNING" if pids else "🔴 STOPPED"
+                print(f"  [{name}] {status} PIDs={pids}")
+                print(
+                    f"    Log: {log_state['size']} bytes, {log_state['total_lines']} lines,"
+                    f" Growing: {growing} (+{growth}b)"
+                )
+                print(
+                    f"    Errors: {log_state['errors']}, Warnings: {log_state['warnings']}, Prompts: {log_state['prompts']}"
+                )
+
+                if log_state["recent_errors"]:
+                    print(f"    Recent errors:")
+                    for err in list(log_state["recent_errors"])[-3:]:
+                        print(f"      ! {err[:150]}")
+
+            # System metrics
+            sys_metrics = get_system_metrics(proc_map)
+            snapshot["system"] = sys_metrics
             print(
-                f"    Errors: {error_info['errors']}, Warnings: {error_info['warnings']}, Prompts: {prompts}"
+                f"  [SYSTEM] Mem: {sys_metrics.get('mem_used_mb', '?')}/{sys_metrics.get('mem_total_mb', '?')}MB ({sys_metrics.get('mem_pct', '?')}%)"
             )
-
-            if error_info["recent_errors"]:
-                print(f"    Recent errors:")
-                for err in error_info["recent_errors"][-3:]:
-                    print(f"      ! {err[:150]}")
-
-        # System metrics
-        sys_metrics = get_system_metrics()
-        snapshot["system"] = sys_metrics
-        print(
-            f"  [SYSTEM] Mem: {sys_metrics.get('mem_used_mb', '?')}/{sys_metrics.get('mem_total_mb', '?')}MB ({sys_metrics.get('mem_pct', '?')}%)"
-        )
-        print(
-            f"           Load: {sys_metrics.get('load_1m', '?')} (1m), {sys_metrics.get('load_5m', '?')} (5m)"
-        )
-        for name in PROFILES:
-            rss_key = f"rss_{name}_mb"
-            if rss_key in sys_metrics:
-                print(f"           RSS {name}: {sys_metrics[rss_key]}MB")
-
-        all_snapshots.append(snapshot)
-
-        # Wait for next check
-        time.sleep(CHECK_INTERVAL)
+            print(
+                f"           Load: {sys_metrics.get('load_1m', '?')} (1m), {sys_metrics.get('load_5m', '?')} (5m)"
+            )
+            for name in PROFILES:
+                rss_key = f"rss_{name}_mb"
+                if rss_key in sys_metrics:
+                    print(
+                        f"           RSS {name}: {sys_metrics[rss_key]}MB"
+                        f" (PSS {sys_metrics[f'pss_{name}_mb']}MB)"
+                    )
+
+            snapshot["check_wall_time"] = round(time.time() - tick_start, 3)
+            # One write per line, so a signal cannot land between a snapshot and its newline
+            report.write(json.dumps(snapshot, default=str) + "\n")
+            if first_snapshot is None:
+                first_snapshot = snapshot
+            last_snapshot = snapshot
+            ever_running.update(name for name in PROFILES if snapshot[name]["running"])
+
+            # Back off while every profile is idle, snap back once activity resumes
+            if any_activity:
+                idle_ticks = 0
+                interval = CHECK_INTERVAL
+            else:
+                idle_ticks += 1
+                if idle_ticks >= IDLE_TICKS_BEFORE_BACKOFF:
+                    interval = min(interval * 2, MAX_CHECK_INTERVAL)
+
+            # Sleep until the next deadline so slow checks don't stretch the cadence
+            next_tick = max(next_tick + interval, tick_start)
+            time.sleep(max(0.0, next_tick - time.time()))
+    except (KeyboardInterrupt, SystemExit):
+        print(f"\n>>> Stopped. Partial report saved to: {report_file}")
+        raise
+    finally:
+        report.close()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
 
     # Final summary
     print("\n" + "=" * 80)
     print("=== FINAL SUMMARY ===")
 
     total_elapsed = time.time() - start_time
-    print(f"Total monitoring time: {int(total_elapsed)}s ({len(all_snapshots)} checks)")
+    print(f"Total monitoring time: {int(total_elapsed)}s ({check_num} checks)")
 
     for name in PROFILES:
-        last = all_snapshots[-1].get(name, {})
-        first = all_snapshots[0].get(name, {}) if all_snapshots else {}
+        last = last_snapshot.get(name, {}) if last_snapshot else {}
+        first = first_snapshot.get(name, {}) if first_snapshot else {}
 
         print(f"\n  [{name}]:")
         print(f"    Final status: {'RUNNING' if last.get('running') else 'STOPPED'}")
         print(f"    Log growth: {first.get('log_size', 0)} -> {last.get('log_size', 0)} bytes")
         print(f"    Total errors: {last.get('errors', 0)}")
         print(f"    Total warnings: {last.get('warnings', 0)}")
-        print(f"    Prompts sent: {last.get('prompts', 0)}")
+        print(f"    Prompts sent: {last.get('prompts_sent', 0)}")
 
         # Check for crashes (profile started but then stopped)
-        was_running = any(s.get(name, {}).get("running", False) for s in all_snapshots)
+        was_running = name in ever_running
         is_running = last.get("running", False)
         if was_running and not is_running:
             print(f"    ⚠️ CRASH DETECTED: Profile was running but then stopped")
         elif not was_running:
             print(f"    ⚠️ NEVER STARTED: Profile never showed as running")
 
-    # Save full report
-    report_file = PROJECT_ROOT / "logs" / "farm_monitor_report.json"
-    with open(report_file, "w") as f:
-        json.dump(all_snapshots, f, indent=2, default=str)
     print(f"\nFull report saved to: {report_file}")
 
     # Print log tails for analysis
     print("\n" + "=" * 80)
     print("=== LOG TAILS ===")
     for name in PROFILES:
-        log_info = get_log_info(name)
-        print(f"\n--- {name} (last 30 lines) ---")
-        print(log_info.get("tail", "No log"))
+        log_state = update_log_state(name)
+        print(f"\n--- {name} (last {TAIL_LINES} lines) ---")
+        print("\n".join(log_state["tail"]) if log_state["exists"] else "No log")
 
 
 if __name__ == "__main__":
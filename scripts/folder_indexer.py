@@ -10,10 +10,14 @@ Usage:
     python scripts/folder_indexer.py --daemon           # Run continuously
     python scripts/folder_indexer.py --daemon --interval 300  # Every 5 min
     python scripts/folder_indexer.py --path /mnt/nas/...  # Index specific path
+    python scripts/folder_indexer.py --daemon --watch   # Re-index local folders on change
 """
 
 import argparse
+import csv
+import io
 import logging
+import math
 import os
 import signal
 import sys
@@ -27,6 +31,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import psycopg2
 from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+try:
+    from inotify_simple import INotify
+    from inotify_simple import flags as inotify_flags
+
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,9 +51,25 @@ logger = logging.getLogger(__name__)
 # Graceful shutdown
 SHUTDOWN = False
 
+DEFAULT_OCR_TABLE = "public.ocr_raw_texts"
+
+# Mounts where inotify does not see changes made by other hosts
+NETWORK_FSTYPES: frozenset[str] = frozenset(
+    {"nfs", "nfs4", "cifs", "smb3", "smbfs", "fuse.sshfs", "9p"}
+)
+
+# Upper bound on folders synced per worker transaction
+SYNC_BATCH_MAX_FOLDERS = 50
+# Rows pulled per round-trip from server-side cursors
+FETCH_BATCH_SIZE = 10_000
+
 ALLOWED_IMAGE_SUFFIXES: frozenset[str] = frozenset(
     {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
 )
+# Same extensions without the leading dot, for checks on raw file names
+_SUFFIXES_NO_DOT: frozenset[str] = frozenset(s[1:] for s in ALLOWED_IMAGE_SUFFIXES)
+
+_IGNORED_FILE_NAMES: frozenset[str] = frozenset({"Thumbs.db", ".DS_Store", "desktop.ini"})
 
 
 def signal_handler(signum, frame):
@@ -53,8 +82,8 @@ signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 
-def get_db_connection():
-    """Get PostgreSQL connection from environment."""
+def get_db_dsn() -> str | None:
+    """Get PostgreSQL DSN from environment."""
     pg_uri = (
         os.environ.get("OCR_PG_URI")
         or os.environ.get("OCR_PG_DSN")
@@ -62,6 +91,13 @@ def get_db_connection():
     )
     if not pg_uri:
         logger.error("❌ No database connection: set OCR_PG_URI, OCR_PG_DSN, or DATABASE_URL")
+    return pg_uri
+
+
+def get_db_connection():
+    """Get PostgreSQL connection from environment."""
+    pg_uri = get_db_dsn()
+    if not pg_uri:
         return None
     try:
         conn = psycopg2.connect(pg_uri)
@@ -72,29 +108,44 @@ def get_db_connection():
         return None
 
 
+def get_db_pool(max_connections: int):
+    """Get a thread-safe PostgreSQL connection pool from environment."""
+    pg_uri = get_db_dsn()
+    if not pg_uri:
+        return None
+    try:
+        return ThreadedConnectionPool(1, max_connections, pg_uri)
+    except Exception as e:
+        logger.error(f"❌ Database connection failed: {e}")
+        return None
+
+
 def scan_folder(source_path: str) -> list[tuple[str, str, str, float | None]]:
     """Scan a folder and return list of file entries."""
     path = Path(source_path)
-    if not path.exists() or not path.is_dir():
-        return []
-
     entries = []
     try:
-        for entry in path.iterdir():
-            if not entry.is_file():
-                continue
-            if entry.name in {"Thumbs.db", ".DS_Store", "desktop.ini"}:
-                continue
-            # Skip hidden files
-            if entry.name.startswith("."):
-                continue
-            if entry.suffix.lower() not in ALLOWED_IMAGE_SUFFIXES:
-                continue
-            try:
-                mtime_epoch = entry.stat().st_mtime
-            except Exception:
-                mtime_epoch = None
-            entries.append((source_path, entry.name, str(entry), mtime_epoch))
+        # DirEntry caches d_type from getdents, so only symlinks need an extra stat
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if name in _IGNORED_FILE_NAMES:
+                    continue
+                # Skip hidden files
+                if name.startswith("."):
+                    continue
+                _, dot, ext = name.rpartition(".")
+                if not dot or ext.lower() not in _SUFFIXES_NO_DOT:
+                    continue
+                if not entry.is_file():
+                    continue
+                try:
+                    mtime_epoch = entry.stat().st_mtime
+                except Exception:
+                    mtime_epoch = None
+                entries.append((source_path, name, entry.path, mtime_epoch))
+    except (FileNotFoundError, NotADirectoryError):
+        return []
     except PermissionError:
         logger.warning(f"⚠️ Permission denied: {source_path}")
     except Exception as e:
@@ -103,88 +154,164 @@ def scan_folder(source_path: str) -> list[tuple[str, str, str, float | None]]:
     return entries
 
 
-def sync_folder_to_db(conn, source_path: str, entries: list) -> int:
-    """Sync folder entries to database."""
-    file_count = len(entries)
+def _copy_entries_to_stage(cur, entries: list) -> None:
+    """Bulk-load entries into the _folder_stage temp table via COPY."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(entries)
+    buf.seek(0)
+    cur.copy_expert(
+        "COPY _folder_stage (source_path, file_name, full_path, mtime_epoch) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+
+
+def sync_folders_to_db(conn, folder_entries: dict[str, list]) -> bool:
+    """Sync entries for one or more folders to the database in a single transaction.
+
+    Entries are streamed with COPY into a transaction-scoped staging table and
+    merged in one statement; counts are upserted with one multi-row INSERT and
+    the whole batch commits once.
+    """
+    if not folder_entries:
+        return True
+    paths = list(folder_entries)
+    prev_autocommit = conn.autocommit
+    conn.autocommit = False
     try:
         with conn.cursor() as cur:
-            # Update folder count
-            cur.execute(
+            # Update folder counts
+            execute_values(
+                cur,
                 """
                 INSERT INTO public.folder_file_counts (source_path, file_count, last_updated)
-                VALUES (%s, %s, NOW())
+                VALUES %s
                 ON CONFLICT (source_path)
                 DO UPDATE SET file_count = EXCLUDED.file_count, last_updated = NOW()
                 """,
-                (source_path, file_count),
+                [(path, len(entries)) for path, entries in folder_entries.items()],
+                template="(%s, %s, NOW())",
             )
 
             # Delete old entries
             cur.execute(
-                "DELETE FROM public.folder_file_entries WHERE source_path = %s",
-                (source_path,),
+                "DELETE FROM public.folder_file_entries WHERE source_path = ANY(%s)",
+                (paths,),
             )
 
-            # Insert new entries in batch
-            if entries:
-                execute_values(
-                    cur,
+            # Insert new entries via COPY + merge
+            all_entries = [row for entries in folder_entries.values() for row in entries]
+            if all_entries:
+                cur.execute(
+                    """
+                    CREATE TEMP TABLE _folder_stage (
+                        source_path TEXT,
+                        file_name TEXT,
+                        full_path TEXT,
+                        mtime_epoch DOUBLE PRECISION
+                    ) ON COMMIT DROP
+                    """
+                )
+                _copy_entries_to_stage(cur, all_entries)
+                cur.execute(
                     """
                     INSERT INTO public.folder_file_entries
                         (source_path, file_name, full_path, mtime_epoch)
-                    VALUES %s
-                    """,
-                    entries,
-                    page_size=1000,
+                    SELECT source_path, file_name, full_path, COALESCE(mtime_epoch, 0)
+                    FROM _folder_stage
+                    ON CONFLICT (source_path, file_name) DO UPDATE
+                    SET full_path = EXCLUDED.full_path, mtime_epoch = EXCLUDED.mtime_epoch
+                    """
                 )
-        return file_count
+        conn.commit()
+        return True
     except Exception as e:
-        logger.error(f"❌ DB sync failed for {source_path}: {e}")
+        conn.rollback()
+        target = paths[0] if len(paths) == 1 else f"{len(paths)} folders"
+        logger.error(f"❌ DB sync failed for {target}: {e}")
+        return False
+    finally:
+        conn.autocommit = prev_autocommit
+
+
+def sync_folder_to_db(conn, source_path: str, entries: list) -> int:
+    """Sync folder entries to database."""
+    if not sync_folders_to_db(conn, {source_path: entries}):
         return 0
+    return len(entries)
+
+
+def _iter_column_batches(conn, sql: str, params: tuple | None = None):
+    """Yield lists of first-column values from a server-side cursor.
+
+    Rows arrive FETCH_BATCH_SIZE at a time instead of being materialized by
+    fetchall(). Named cursors only exist inside a transaction, so autocommit
+    is switched off for the duration and restored afterwards.
+    """
+    prev_autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor(name="folder_indexer_stream") as cur:
+            cur.itersize = FETCH_BATCH_SIZE
+            cur.execute(sql, params)
+            while rows := cur.fetchmany(FETCH_BATCH_SIZE):
+                yield [row[0] for row in rows]
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = prev_autocommit
 
 
 def get_known_source_paths(conn) -> list[str]:
     """Get all unique source_paths from OCR table that need indexing."""
     table = os.environ.get("OCR_PG_TABLE", "public.ocr_raw_texts")
     try:
-        with conn.cursor() as cur:
-            # Get folders from OCR table that exist in filesystem
-            cur.execute(
-                f"""
-                SELECT DISTINCT source_path 
-                FROM {table}
-                WHERE source_path IS NOT NULL
-                ORDER BY source_path
-                """
-            )
-            return [row[0] for row in cur.fetchall()]
+        # Get folders from OCR table that exist in filesystem
+        sql = f"""
+            SELECT DISTINCT source_path
+            FROM {table}
+            WHERE source_path IS NOT NULL
+            ORDER BY source_path
+            """
+        return [path for batch in _iter_column_batches(conn, sql) for path in batch]
     except Exception as e:
         logger.error(f"❌ Failed to get source paths: {e}")
         return []
 
 
-def get_folders_needing_update(conn, max_age_minutes: int = 30) -> list[str]:
-    """Get folders that haven't been updated recently."""
+def iter_folders_needing_update(conn, max_age_minutes: int = 30):
+    """Yield batches of folders that haven't been updated recently.
+
+    Use a connection that is not syncing at the same time: the server-side
+    cursor keeps a transaction open until the last batch is read.
+    """
     table = os.environ.get("OCR_PG_TABLE", "public.ocr_raw_texts")
+    # source_path_seen is trigger-maintained for the default table (migrations 010/015),
+    # so it replaces a DISTINCT scan over every OCR row.
+    if table == DEFAULT_OCR_TABLE:
+        sources_sql = "SELECT source_path FROM public.source_path_seen"
+    else:
+        sources_sql = f"SELECT DISTINCT source_path FROM {table} WHERE source_path IS NOT NULL"
+    # Folders in OCR table but not in folder_file_counts OR outdated
+    sql = f"""
+        SELECT r.source_path
+        FROM ({sources_sql}) r
+        LEFT JOIN public.folder_file_counts f ON r.source_path = f.source_path
+        WHERE (f.source_path IS NULL
+               OR f.last_updated < NOW() - make_interval(mins => %s))
+        ORDER BY r.source_path
+        """
     try:
-        with conn.cursor() as cur:
-            # Folders in OCR table but not in folder_file_counts OR outdated
-            cur.execute(
-                f"""
-                SELECT DISTINCT r.source_path
-                FROM {table} r
-                LEFT JOIN public.folder_file_counts f ON r.source_path = f.source_path
-                WHERE r.source_path IS NOT NULL
-                  AND (f.source_path IS NULL 
-                       OR f.last_updated < NOW() - INTERVAL '%s minutes')
-                ORDER BY r.source_path
-                """,
-                (max_age_minutes,),
-            )
-            return [row[0] for row in cur.fetchall()]
+        yield from _iter_column_batches(conn, sql, (max_age_minutes,))
     except Exception as e:
         logger.error(f"❌ Failed to get folders needing update: {e}")
-        return []
+
+
+def get_folders_needing_update(conn, max_age_minutes: int = 30) -> list[str]:
+    """Get folders that haven't been updated recently."""
+    return [path for batch in iter_folders_needing_update(conn, max_age_minutes) for path in batch]
 
 
 def index_folder(conn, source_path: str) -> dict[str, Any]:
@@ -206,83 +333,230 @@ def index_folder(conn, source_path: str) -> dict[str, Any]:
     }
 
 
-def index_folders_parallel(conn, folders: list[str], max_workers: int = 4) -> list[dict]:
-    """Index multiple folders in parallel."""
+def scan_and_sync(pool, folders: list[str]) -> list[dict]:
+    """Scan a slice of folders and sync them in one transaction on a pooled connection."""
+    folder_entries = {}
+    for folder in folders:
+        if SHUTDOWN:
+            break
+        folder_entries[folder] = scan_folder(folder)
+    if SHUTDOWN or not folder_entries:
+        return []
+
+    conn = pool.getconn()
+    try:
+        start = time.time()
+        synced = sync_folders_to_db(conn, folder_entries)
+        db_time = time.time() - start
+    finally:
+        pool.putconn(conn)
+
+    return [
+        {
+            "path": folder,
+            "files": len(entries) if synced else 0,
+            "total_time": db_time,
+        }
+        for folder, entries in folder_entries.items()
+    ]
+
+
+def index_folders_parallel(pool, folders: list[str], max_workers: int = 4) -> list[dict]:
+    """Index multiple folders in parallel.
+
+    Each worker scans a slice of folders and syncs it on its own pooled
+    connection, so DB writes overlap with other workers' scans while each
+    slice still commits only once.
+    """
+    return index_folder_stream(pool, [folders], max_workers)
+
+
+def index_folder_stream(pool, folder_batches, max_workers: int = 4) -> list[dict]:
+    """Index folders arriving in batches, e.g. from iter_folders_needing_update().
+
+    Slices of each batch are submitted as soon as it arrives, so workers start
+    scanning while later batches are still being fetched.
+    """
     results = []
 
-    # Scan in parallel (I/O bound)
-    folder_entries = {}
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_folder = {executor.submit(scan_folder, f): f for f in folders if not SHUTDOWN}
-        for future in as_completed(future_to_folder):
+        futures = {}
+        for folders in folder_batches:
             if SHUTDOWN:
                 break
-            folder = future_to_folder[future]
+            batch_size = max(1, min(SYNC_BATCH_MAX_FOLDERS, math.ceil(len(folders) / max_workers)))
+            for i in range(0, len(folders), batch_size):
+                batch = folders[i : i + batch_size]
+                futures[executor.submit(scan_and_sync, pool, batch)] = batch
+        for future in as_completed(futures):
             try:
-                entries = future.result()
-                folder_entries[folder] = entries
+                results.extend(future.result())
             except Exception as e:
-                logger.error(f"❌ Scan failed for {folder}: {e}")
+                logger.error(f"❌ Indexing failed for {len(futures[future])} folders: {e}")
 
-    # Sync to DB sequentially (to avoid connection issues)
-    for folder, entries in folder_entries.items():
-        if SHUTDOWN:
-            break
-        start = time.time()
-        count = sync_folder_to_db(conn, folder, entries)
-        results.append(
-            {
-                "path": folder,
-                "files": count,
-                "total_time": time.time() - start,
-            }
+    return results
+
+
+# /proc/mounts fields: device, mount point, fstype, options, ...
+_MOUNTS_MIN_FIELDS = 3
+
+
+def _read_mounts() -> list[tuple[str, str]]:
+    """Return (mount_point, fstype) pairs, longest mount point first."""
+    mounts = []
+    try:
+        with Path("/proc/mounts").open(encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= _MOUNTS_MIN_FIELDS:
+                    mounts.append((parts[1].replace("\\040", " "), parts[2]))
+    except OSError:
+        pass
+    mounts.sort(key=lambda m: len(m[0]), reverse=True)
+    return mounts
+
+
+def _is_network_fs(path: str, mounts: list[tuple[str, str]]) -> bool:
+    """Check whether a path lives on a mount where inotify misses remote changes."""
+    for mount_point, fstype in mounts:
+        if path == mount_point or path.startswith(mount_point.rstrip("/") + "/"):
+            return fstype in NETWORK_FSTYPES
+    return False
+
+
+class FolderWatcher:
+    """inotify watches on indexed folders; reports folders whose contents changed."""
+
+    def __init__(self):
+        self.inotify = INotify()
+        self.wd_to_path: dict[int, str] = {}
+        self.watched: set[str] = set()
+        self._mounts = _read_mounts()
+        self._mask = (
+            inotify_flags.CREATE
+            | inotify_flags.DELETE
+            | inotify_flags.MOVED_TO
+            | inotify_flags.MOVED_FROM
+            | inotify_flags.CLOSE_WRITE
         )
 
+    def add(self, folders: list[str]) -> None:
+        """Watch local folders; network mounts are left to periodic rescans."""
+        for folder in folders:
+            if folder in self.watched or _is_network_fs(folder, self._mounts):
+                continue
+            try:
+                wd = self.inotify.add_watch(folder, self._mask)
+            except OSError:
+                continue
+            self.wd_to_path[wd] = folder
+            self.watched.add(folder)
+
+    def wait(self, timeout_s: float) -> set[str]:
+        """Block up to timeout_s for events and return the set of changed folders."""
+        changed = set()
+        for event in self.inotify.read(timeout=int(timeout_s * 1000), read_delay=500):
+            folder = self.wd_to_path.get(event.wd)
+            if folder is None:
+                continue
+            if event.mask & inotify_flags.IGNORED:
+                # Folder removed or unmounted: the watch is gone
+                del self.wd_to_path[event.wd]
+                self.watched.discard(folder)
+            changed.add(folder)
+        return changed
+
+    def close(self) -> None:
+        self.inotify.close()
+
+
+def _announce_batches(folder_batches):
+    for folders in folder_batches:
+        if folders:
+            logger.info(f"📁 Found {len(folders)} folders to index")
+            yield folders
+
+
+def _index_folders(conn, pool, folder_batches, parallel_workers: int) -> list[dict]:
+    """Index batches of folders, in parallel when a pool and several workers are available."""
+    folder_batches = _announce_batches(folder_batches)
+    if pool is not None and parallel_workers > 1:
+        return index_folder_stream(pool, folder_batches, parallel_workers)
+
+    results = []
+    for folders in folder_batches:
+        for folder in folders:
+            if SHUTDOWN:
+                return results
+            result = index_folder(conn, folder)
+            results.append(result)
+            logger.info(
+                f"  ✓ {result['files']:>4} files in {result['total_time']:.1f}s: "
+                f"{Path(result['path']).name}"
+            )
     return results
 
 
+def _watch_until_next_run(watcher, folders: list[str], interval: int, reindex) -> None:
+    """Add folders to the watch set and re-index changed ones until the next full run."""
+    watcher.add(folders)
+    logger.info(f"👀 Watching {len(watcher.watched)} folders, next full run in {interval}s...")
+    deadline = time.time() + interval
+    while not SHUTDOWN and time.time() < deadline:
+        changed = watcher.wait(min(1.0, deadline - time.time()))
+        if changed and not SHUTDOWN:
+            logger.info(f"🔔 {len(changed)} watched folders changed, re-indexing")
+            reindex(changed)
+
+
 def run_indexer(
     conn,
+    pool=None,
     specific_path: str | None = None,
     daemon: bool = False,
     interval: int = 300,
     max_age: int = 30,
     parallel_workers: int = 4,
+    watch: bool = False,
 ):
     """Main indexer loop."""
     iteration = 0
+    watcher = FolderWatcher() if watch and daemon and HAS_INOTIFY else None
 
     while True:
         iteration += 1
         logger.info(f"📂 Starting indexer run #{iteration}...")
         start_time = time.time()
 
+        read_conn = stream = None
         if specific_path:
             # Index specific path
-            folders = [specific_path]
+            folder_batches = [[specific_path]]
         else:
             # Get folders needing update
-            folders = get_folders_needing_update(conn, max_age)
+            if pool is not None and parallel_workers > 1:
+                # Dedicated connection: its cursor stays open while workers index
+                read_conn = pool.getconn()
+                folder_batches = stream = iter_folders_needing_update(read_conn, max_age)
+            else:
+                folder_batches = [get_folders_needing_update(conn, max_age)]
+            if watcher is not None:
+                # Watched folders are re-indexed on change, not by age
+                folder_batches = (
+                    [f for f in folders if f not in watcher.watched] for folders in folder_batches
+                )
+
+        try:
+            results = _index_folders(conn, pool, folder_batches, parallel_workers)
+        finally:
+            if read_conn is not None:
+                stream.close()  # ends the cursor's transaction if indexing stopped early
+                pool.putconn(read_conn)
+        folders = [r["path"] for r in results]
 
-        if not folders:
+        if not results:
             logger.info("✅ All folders are up to date")
         else:
-            logger.info(f"📁 Found {len(folders)} folders to index")
-
-            if len(folders) > 1 and parallel_workers > 1:
-                results = index_folders_parallel(conn, folders, parallel_workers)
-            else:
-                results = []
-                for folder in folders:
-                    if SHUTDOWN:
-                        break
-                    result = index_folder(conn, folder)
-                    results.append(result)
-                    logger.info(
-                        f"  ✓ {result['files']:>4} files in {result['total_time']:.1f}s: "
-                        f"{Path(result['path']).name}"
-                    )
-
             total_files = sum(r["files"] for r in results)
             total_time = time.time() - start_time
             logger.info(
@@ -293,15 +567,25 @@ def run_indexer(
             break
 
         # Wait for next iteration
-        logger.info(f"💤 Sleeping {interval}s until next run...")
-        for _ in range(interval):
-            if SHUTDOWN:
-                break
-            time.sleep(1)
+        if watcher is not None:
+            _watch_until_next_run(
+                watcher,
+                folders,
+                interval,
+                lambda changed: _index_folders(conn, pool, [sorted(changed)], parallel_workers),
+            )
+        else:
+            logger.info(f"💤 Sleeping {interval}s until next run...")
+            for _ in range(interval):
+                if SHUTDOWN:
+                    break
+                time.sleep(1)
 
         if SHUTDOWN:
             break
 
+    if watcher is not None:
+        watcher.close()
     logger.info("👋 Indexer stopped")
 
 
@@ -327,23 +611,36 @@ def main():
         default=4,
         help="Parallel workers for scanning (default: 4)",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="In daemon mode, re-index local folders on inotify events (needs inotify_simple)",
+    )
     args = parser.parse_args()
 
-    conn = get_db_connection()
-    if not conn:
+    if args.watch and not HAS_INOTIFY:
+        logger.warning("⚠️ inotify_simple not installed, --watch falls back to periodic scans")
+
+    pool = get_db_pool(max(1, args.workers) + 2)
+    if not pool:
         sys.exit(1)
+    conn = pool.getconn()
+    conn.autocommit = True
 
     try:
         run_indexer(
             conn,
+            pool=pool,
             specific_path=args.path,
             daemon=args.daemon,
             interval=args.interval,
             max_age=args.max_age,
             parallel_workers=args.workers,
+            watch=args.watch,
         )
     finally:
-        conn.close()
+        pool.putconn(conn)
+        pool.closeall()
 
 
 if __name__ == "__main__":
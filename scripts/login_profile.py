@@ -1,6 +1,10 @@
+import fcntl
 import json
 import logging
 import os
+import signal
+import socket
+import struct
 import subprocess
 import sys
 import time
@@ -10,14 +14,161 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root / "src"))
 
-from ocr_engine.ocr.engine.auto_login import AutoLogin
-from ocr_engine.ocr.engine.browser_controller import GeminiBrowserController
+from browser_pool import read_pool_endpoint
+
 from ocr_engine.utils.path_security import sanitize_profile_name, validate_profiles_dir
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Both parse bytes directly; orjson skips the bytes -> str decode step
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("login_profile")
 
+CACHE_DIR = Path.home() / ".cache" / "ocr-dashboard-v3"
+X11_CONFIG = CACHE_DIR / "x11_display.json"
+
+# Readiness probe delays after starting Xvfb (~1.5s worst case)
+XVFB_READY_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+# Shared Xvfb for concurrent logins: "<pid> <display>", flock-guarded
+XVFB_PID_FILE = CACHE_DIR / "xvfb.pid"
+# Every login using the shared Xvfb holds a shared flock here; the last one out stops it
+XVFB_USERS_FILE = XVFB_PID_FILE.with_suffix(".users")
+_XVFB_USER_LOCK = None
+
+
+# X11 connection setup: little-endian byte order, protocol 11.0, no auth data
+_X11_SETUP_REQUEST = struct.pack("<BxHHHHxx", ord("l"), 11, 0, 0, 0)
+X11_PROBE_ATTEMPTS = 2
+
+# Polish and English variants, matched in a single query
+CONSENT_BUTTON_SELECTOR = ", ".join(
+    [
+        "button:has-text('Zaakceptuj wszystko')",
+        "button:has-text('Accept all')",
+        "button:has-text('Akceptuję')",
+        "button:has-text('I agree')",
+    ]
+)
+CONSENT_WAIT_TIMEOUT = 5000  # ms
+
+CAPTCHA_SELECTOR = "iframe[src*='recaptcha'], iframe[title*='reCAPTCHA'], div.g-recaptcha"
+CAPTCHA_MAX_WAIT = 300  # seconds
+CAPTCHA_HEARTBEAT = 30  # seconds between "still waiting" log lines
+# Evaluated in the page, so one call covers every selector
+_CAPTCHA_VISIBLE_JS = """selector => Array.from(document.querySelectorAll(selector)).some(
+    el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden"
+)"""
+
+
+def _probe_x11(display: str, timeout: float = 0.2) -> bool | None:
+    """Handshake with the X server behind ``display`` over its socket.
+
+    Returns True if the server accepts the connection, False if nothing
+    answers, and None if a server answered but wants authorization (the
+    caller then falls back to xset, which reads XAUTHORITY).
+    """
+    host, _, rest = display.rpartition(":")
+    try:
+        number = int(rest.split(".", 1)[0])
+    except ValueError:
+        return False
+
+    if host in ("", "unix"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = f"/tmp/.X11-unix/X{number}"
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = (host, 6000 + number)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+        sock.sendall(_X11_SETUP_REQUEST)
+        reply = sock.recv(8)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    if not reply:
+        return False
+    return True if reply[0] == 1 else None
+
+
+def _xset_ready(display: str, timeout: float) -> bool:
+    os.environ["DISPLAY"] = display
+    try:
+        result = subprocess.run(
+            ["xset", "-q"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+            check=False,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+    return result.returncode == 0
+
+
+def _display_ready(display: str, timeout: float = 3) -> bool:
+    """Return True if an X server answers on ``display``.
+
+    A direct socket handshake avoids forking xset on every login; xset is only
+    used when the server insists on authorization.
+    """
+    for attempt in range(X11_PROBE_ATTEMPTS):
+        ready = _probe_x11(display)
+        if ready is None:
+            return _xset_ready(display, timeout)
+        if ready:
+            return True
+        if attempt + 1 < X11_PROBE_ATTEMPTS:
+            time.sleep(0.02)  # VMs occasionally drop the first connect
+    return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _kill_xvfb(display: str) -> int:
+    """SIGTERM every Xvfb serving ``display`` found in /proc; returns how many.
+
+    In-process replacement for ``pkill -f "Xvfb <display>"``.
+    """
+    target = display.encode()
+    killed = []
+    with os.scandir("/proc") as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            try:
+                args = Path(entry.path, "cmdline").read_bytes().split(b"\x00")
+                pid = int(entry.name)
+                if Path(os.fsdecode(args[0])).name == "Xvfb" and target in args[1:]:
+                    os.kill(pid, signal.SIGTERM)
+                    killed.append(pid)
+            except OSError:
+                continue
+
+    # Give them a moment to exit and release the display lock
+    deadline = time.monotonic() + 1
+    pending = killed
+    while pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+        pending = [pid for pid in pending if _pid_alive(pid)]
+    return len(killed)
+
 
 def _ensure_display() -> str:
     """
@@ -26,28 +177,14 @@ def _ensure_display() -> str:
     """
     # Check if DISPLAY is already set and working
     existing_display = os.environ.get("DISPLAY", "")
-    if existing_display:
-        try:
-            result = subprocess.run(
-                ["xset", "-q"],
-                env={**os.environ, "DISPLAY": existing_display},
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                timeout=3,
-                check=False,
-            )
-            if result.returncode == 0:
-                logger.info(f"✅ Using existing X11 display: {existing_display}")
-                return existing_display
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+    if existing_display and _display_ready(existing_display):
+        logger.info(f"✅ Using existing X11 display: {existing_display}")
+        return existing_display
 
     # Try loading from config
     try:
-        cache_dir = Path.home() / ".cache" / "ocr-dashboard-v3"
-        config_file = cache_dir / "x11_display.json"
-        if config_file.exists():
-            data = json.loads(config_file.read_text(encoding="utf-8"))
+        if X11_CONFIG.exists():
+            data = _json_loads(X11_CONFIG.read_bytes())
             display = data.get("display", "").strip()
             if display:
                 logger.info(f"Loaded X11 Display from config: {display}")
@@ -56,35 +193,228 @@ def _ensure_display() -> str:
     except Exception as e:
         logger.debug(f"Failed to load X11 config: {e}")
 
-    # No display available - start Xvfb
-    logger.info("No X11 display available. Starting Xvfb virtual display...")
-    xvfb_display = ":99"
+    # No display available - start Xvfb (or join the one another login started)
     try:
-        # Kill any existing Xvfb on :99
-        subprocess.run(
-            ["pkill", "-f", f"Xvfb {xvfb_display}"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False,
-        )
-        time.sleep(0.5)
-
-        # Start Xvfb
-        subprocess.Popen(
-            ["Xvfb", xvfb_display, "-screen", "0", "1920x1080x24", "-ac"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        time.sleep(1)
-        os.environ["DISPLAY"] = xvfb_display
-        logger.info(f"✅ Xvfb started on {xvfb_display}")
-        return xvfb_display
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with XVFB_PID_FILE.open("a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            xvfb_display, shared = _start_or_join_xvfb(lock, ":99")
+            if shared:
+                _join_xvfb_users()
     except Exception as e:
         logger.error(f"❌ Failed to start Xvfb: {e}")
         # Last resort fallback
         os.environ["DISPLAY"] = ":0"
         return ":0"
 
+    os.environ["DISPLAY"] = xvfb_display
+    return xvfb_display
+
+
+def _is_xvfb(pid: int) -> bool:
+    try:
+        argv0 = Path(f"/proc/{pid}/cmdline").read_bytes().split(b"\x00", 1)[0]
+    except OSError:
+        return False
+    return Path(os.fsdecode(argv0)).name == "Xvfb"
+
+
+def _recorded_xvfb(lock) -> tuple[int, str] | None:
+    """Return (pid, display) from the pid file if that Xvfb is still running."""
+    lock.seek(0)
+    try:
+        pid, display = lock.read().split()
+    except ValueError:
+        return None
+    if pid.isdigit() and _is_xvfb(int(pid)):
+        return int(pid), display
+    return None
+
+
+def _start_or_join_xvfb(lock, xvfb_display: str) -> tuple[str, bool]:
+    """Return (display, shared) while holding the pid-file lock.
+
+    ``shared`` is True when the display is the recorded shared Xvfb, which this
+    process must then register as a user of.
+    """
+    recorded = _recorded_xvfb(lock)
+    if recorded:
+        # Started by a concurrent login: no probe, no startup wait
+        pid, display = recorded
+        logger.info(f"✅ Using shared Xvfb on {display} (pid {pid})")
+        return display, True
+
+    if _display_ready(xvfb_display, timeout=1):
+        logger.info(f"✅ Reusing running Xvfb on {xvfb_display}")
+        return xvfb_display, False
+
+    logger.info("No X11 display available. Starting Xvfb virtual display...")
+    # A hung Xvfb still holding the display would make ours exit immediately
+    if _kill_xvfb(xvfb_display):
+        logger.info(f"Stopped unresponsive Xvfb on {xvfb_display}")
+
+    xvfb_proc = subprocess.Popen(
+        ["Xvfb", xvfb_display, "-screen", "0", "1920x1080x24", "-ac"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Outlives this login if others still use it; not hit by our terminal's Ctrl-C
+        start_new_session=True,
+    )
+
+    # Poll until the server accepts connections instead of sleeping blindly
+    for delay in XVFB_READY_DELAYS:
+        if _display_ready(xvfb_display, timeout=1):
+            break
+        time.sleep(delay)
+    else:
+        logger.warning(f"Xvfb on {xvfb_display} not answering yet, continuing anyway")
+
+    if xvfb_proc.poll() is not None:
+        # Ours exited (display already taken): use it, but never stop it
+        return xvfb_display, False
+
+    lock.seek(0)
+    lock.truncate()
+    lock.write(f"{xvfb_proc.pid} {xvfb_display}\n")
+    lock.flush()
+    logger.info(f"✅ Xvfb started on {xvfb_display}")
+    return xvfb_display, True
+
+
+def _join_xvfb_users() -> None:
+    global _XVFB_USER_LOCK  # noqa: PLW0603
+    _XVFB_USER_LOCK = XVFB_USERS_FILE.open("a")
+    fcntl.flock(_XVFB_USER_LOCK, fcntl.LOCK_SH)
+
+
+def _release_xvfb() -> None:
+    """Leave the shared Xvfb, stopping it if no other login still uses it."""
+    global _XVFB_USER_LOCK  # noqa: PLW0603
+    if _XVFB_USER_LOCK is None:
+        return
+    with XVFB_PID_FILE.open("a+") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        _XVFB_USER_LOCK.close()
+        _XVFB_USER_LOCK = None
+        with XVFB_USERS_FILE.open("a") as users:
+            try:
+                fcntl.flock(users, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # another login still holds it
+        recorded = _recorded_xvfb(lock)
+        if recorded:
+            os.kill(recorded[0], signal.SIGTERM)
+        lock.seek(0)
+        lock.truncate()
+
+
+def _captcha_visible(page) -> bool:
+    """Check if a visible CAPTCHA challenge is present on the page."""
+    try:
+        return bool(page.evaluate(_CAPTCHA_VISIBLE_JS, CAPTCHA_SELECTOR))
+    except Exception:
+        return False
+
+
+def _wait_for_captcha(page) -> bool:
+    """Wait for the CAPTCHA to disappear; the check runs inside the browser."""
+    # Deferred like the other Playwright imports: only main() pays for it
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError  # noqa: PLC0415
+
+    start = time.monotonic()
+    deadline = start + CAPTCHA_MAX_WAIT
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            page.wait_for_function(
+                f"selector => !({_CAPTCHA_VISIBLE_JS})(selector)",
+                arg=CAPTCHA_SELECTOR,
+                timeout=min(CAPTCHA_HEARTBEAT, remaining) * 1000,
+                polling=500,
+            )
+            return True
+        except PlaywrightTimeoutError:
+            waited = int(time.monotonic() - start)
+            logger.info(f"Still waiting for CAPTCHA... ({waited}s / {CAPTCHA_MAX_WAIT}s)")
+        except Exception:
+            # A closed page or context fails the same way as a navigation, but
+            # _captcha_visible() would read it as solved
+            if page.is_closed():
+                return False
+            # The page navigated mid-wait (e.g. right after solving); judge it afresh
+            if not _captcha_visible(page):
+                return True
+            time.sleep(1)
+    return not page.is_closed() and not _captcha_visible(page)
+
+
+class PooledLoginBrowser:
+    """Login context inside the shared Chromium started by browser_pool.py.
+
+    Mirrors the parts of GeminiBrowserController that main() uses. The OCR
+    engine reads cookies from the profile's own user-data-dir, so on close the
+    context's cookies are written back there (and to storage_state.json, which
+    seeds the next pooled login).
+    """
+
+    STORAGE_STATE_FILE = "storage_state.json"
+
+    def __init__(self, ws_endpoint: str, profile_dir: Path, locale: str = "pl-PL"):
+        self.ws_endpoint = ws_endpoint
+        self.profile_dir = profile_dir
+        self.locale = locale
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+
+    @property
+    def state_file(self) -> Path:
+        return self.profile_dir / self.STORAGE_STATE_FILE
+
+    def start(self, skip_clean_start: bool = False):  # noqa: ARG002
+        # Deferred like the imports in main(): Playwright is slow to import
+        from playwright.sync_api import sync_playwright  # noqa: PLC0415
+
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.connect_over_cdp(self.ws_endpoint)
+        self.context = self.browser.new_context(
+            storage_state=str(self.state_file) if self.state_file.exists() else None,
+            locale=self.locale,
+            no_viewport=True,
+        )
+        self.page = self.context.new_page()
+        return self.context
+
+    def wait_closed(self) -> None:
+        """Block until the login window is closed or the pool goes away."""
+        self.page.wait_for_event("close", timeout=0)
+
+    def close(self):
+        try:
+            if self.browser and self.browser.is_connected():
+                state = self.context.storage_state(path=str(self.state_file))
+                self.context.close()
+                self._persist_cookies(state["cookies"])
+        finally:
+            if self.playwright:
+                self.playwright.stop()
+
+    def _persist_cookies(self, cookies: list) -> None:
+        """Copy login cookies into the profile's persistent user-data-dir."""
+        if not cookies:
+            return
+        try:
+            context = self.playwright.chromium.launch_persistent_context(
+                user_data_dir=str(self.profile_dir), headless=True, chromium_sandbox=False
+            )
+        except Exception as e:
+            logger.warning(f"Could not open profile to store cookies (in use?): {e}")
+            return
+        try:
+            context.add_cookies(cookies)
+        finally:
+            context.close()
+
 
 def main():
     profile_suffix = os.environ.get("OCR_PROFILE_SUFFIX", "")
@@ -106,18 +436,31 @@ def main():
 
     logger.info(f"Profile Directory: {profile_dir}")
 
-    # Ensure display is available (X11 or Xvfb)
-    display = _ensure_display()
-    logger.info(f"Using DISPLAY={display}")
+    # Playwright and the engine take a few hundred ms to import; only pay for
+    # them once the profile is known to be usable
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError  # noqa: PLC0415
+
+    from ocr_engine.ocr.engine.auto_login import AutoLogin  # noqa: PLC0415
+    from ocr_engine.ocr.engine.browser_controller import GeminiBrowserController  # noqa: PLC0415
 
     # Skip proxy for login - proxy causes navigation hangs in Chromium.
     # The login session (cookies) will be saved to the profile directory
     # and will work when the OCR engine runs with the proxy later.
     logger.info("Note: Proxy disabled for login (session-only mode)")
 
-    controller = GeminiBrowserController(
-        profile_dir=profile_dir, headed=True, enable_video=False, proxy_config=None
-    )
+    pool_endpoint = read_pool_endpoint()
+    if pool_endpoint:
+        # Shared browser already runs on its own display; only a context is needed
+        logger.info(f"Using shared browser pool: {pool_endpoint}")
+        controller = PooledLoginBrowser(pool_endpoint, profile_dir)
+    else:
+        # Ensure display is available (X11 or Xvfb)
+        display = _ensure_display()
+        logger.info(f"Using DISPLAY={display}")
+
+        controller = GeminiBrowserController(
+            profile_dir=profile_dir, headed=True, enable_video=False, proxy_config=None
+        )
 
     try:
         # Start browser WITHOUT clean start check to avoid SessionExpiredError
@@ -143,46 +486,19 @@ def main():
             if "consent.google.com" in page.url:
                 logger.info("Google consent page detected. Accepting cookies...")
                 try:
-                    # Try Polish and English variants
-                    consent_selectors = [
-                        "button:has-text('Zaakceptuj wszystko')",
-                        "button:has-text('Accept all')",
-                        "button:has-text('Akceptuję')",
-                        "button:has-text('I agree')",
-                    ]
-                    for selector in consent_selectors:
-                        btn = page.locator(selector).first
-                        if btn.count() > 0 and btn.is_visible(timeout=2000):
-                            logger.info(f"Clicking consent button: {selector}")
-                            btn.click()
-                            page.wait_for_timeout(3000)
-                            logger.info(f"Consent accepted. Current URL: {page.url}")
-                            break
+                    btn = page.locator(CONSENT_BUTTON_SELECTOR).filter(visible=True).first
+                    btn.wait_for(state="visible", timeout=CONSENT_WAIT_TIMEOUT)
+                    logger.info("Clicking consent button")
+                    btn.click()
+                    page.wait_for_timeout(3000)
+                    logger.info(f"Consent accepted. Current URL: {page.url}")
+                except PlaywrightTimeoutError:
+                    logger.warning("No consent button found")
                 except Exception as e:
                     logger.warning(f"Consent handling error: {e}")
 
             # Check for CAPTCHA and wait for manual resolution
-            def check_for_captcha():
-                """Check if a visible CAPTCHA challenge is present on the page."""
-                try:
-                    captcha_selectors = [
-                        "iframe[src*='recaptcha']",
-                        "iframe[title*='reCAPTCHA']",
-                        "div.g-recaptcha",
-                    ]
-                    for selector in captcha_selectors:
-                        loc = page.locator(selector).first
-                        if loc.count() > 0:
-                            try:
-                                if loc.is_visible(timeout=500):
-                                    return True
-                            except Exception:
-                                continue
-                    return False
-                except Exception:
-                    return False
-
-            if check_for_captcha():
+            if _captcha_visible(page):
                 logger.warning("⚠️ CAPTCHA DETECTED!")
                 logger.info("=" * 60)
                 logger.info("🤖 CAPTCHA must be solved manually")
@@ -190,15 +506,7 @@ def main():
                 logger.info("Waiting for CAPTCHA to be resolved...")
                 logger.info("=" * 60)
 
-                max_wait = 300
-                waited = 0
-                while check_for_captcha() and waited < max_wait:
-                    time.sleep(5)
-                    waited += 5
-                    if waited % 30 == 0:
-                        logger.info(f"Still waiting for CAPTCHA... ({waited}s / {max_wait}s)")
-
-                if check_for_captcha():
+                if not _wait_for_captcha(page):
                     logger.error("❌ CAPTCHA not resolved within 5 minutes. Please try again.")
                 else:
                     logger.info("✅ CAPTCHA resolved! Continuing...")
@@ -229,12 +537,15 @@ def main():
             logger.info("Session will be saved automatically.")
             logger.info("=====================\n")
 
-        while True:
-            time.sleep(1)
-            # Check if browser is still connected
-            if controller.browser and not controller.browser.is_connected():
-                logger.info("Browser closed.")
-                break
+        # Block until the browser goes away. A closing or disconnected browser closes
+        # the context, and waiting on that event keeps Playwright's dispatcher running
+        # (a threading.Event would never be set by the sync API).
+        if isinstance(controller, PooledLoginBrowser):
+            controller.wait_closed()
+            logger.info("Browser closed.")
+        elif controller.context is not None:
+            controller.context.wait_for_event("close", timeout=0)
+            logger.info("Browser closed.")
 
     except KeyboardInterrupt:
         logger.info("Interrupted.")
@@ -243,13 +554,8 @@ def main():
             controller.close()
         except Exception:
             pass
-        # Cleanup Xvfb if we started it
-        subprocess.run(
-            ["pkill", "-f", "Xvfb :99"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=False,
-        )
+        # Leave the shared Xvfb; the last login using it stops it
+        _release_xvfb()
 
 
 if __name__ == "__main__":
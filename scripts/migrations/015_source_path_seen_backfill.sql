@@ -0,0 +1,10 @@
+-- Migration 015: Backfill source_path_seen
+-- source_path_seen (migration 010) is maintained by an insert trigger but was never
+-- seeded with paths that existed before the trigger. Backfill it so the folder indexer
+-- can use it as the list of known source paths instead of scanning ocr_raw_texts.
+
+INSERT INTO public.source_path_seen (source_path)
+SELECT DISTINCT source_path
+FROM public.ocr_raw_texts
+WHERE source_path IS NOT NULL
+ON CONFLICT DO NOTHING;
@@ -16,42 +16,103 @@ Environment Variables:
     OCR_PG_DSN - PostgreSQL connection string (required)
     WEB_DASHBOARD_URL - URL of web dashboard (default: http://localhost:9090)
     FARM_HEALTH_CHECK_INTERVAL - Default interval in seconds (default: 120)
+    FARM_HEALTH_BATCH_SIZE - Rows buffered per database write (default: 10)
 """
 
 from __future__ import annotations
 
 import argparse
+import atexit
+import fcntl
+import functools
 import json
 import os
+import random
+import signal
+import socket
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
+from urllib.parse import urlparse
 
-try:
-    import psycopg2
-    import psycopg2.extras
+# psycopg and requests are imported by _load_dependencies(), so --help and
+# configuration errors exit without paying for them
+psycopg = None
+Json = None
+requests = None
+HTTPAdapter = None
+HAS_PSYCOPG = False
+HAS_REQUESTS = False
 
-    HAS_PSYCOPG2 = True
-except ImportError:
-    HAS_PSYCOPG2 = False
-    print("ERROR: psycopg2 not installed. Run: pip install psycopg2-binary", file=sys.stderr)
-    sys.exit(1)
 
-try:
-    import requests
+def _load_dependencies() -> None:
+    global psycopg, Json, requests, HTTPAdapter, HAS_PSYCOPG, HAS_REQUESTS  # noqa: PLW0603
+    if HAS_PSYCOPG:
+        return
 
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-    print("WARNING: requests not installed. Web API checks will be skipped.", file=sys.stderr)
+    try:
+        # Imported only after argument parsing so --help and config errors stay fast
+        import psycopg  # noqa: PLC0415
+        from psycopg.types.json import Json  # noqa: PLC0415
+
+        HAS_PSYCOPG = True
+    except ImportError:
+        print("ERROR: psycopg not installed. Run: pip install 'psycopg[binary]'", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        import requests  # noqa: PLC0415
+        from requests.adapters import HTTPAdapter  # noqa: PLC0415
+
+        HAS_REQUESTS = True
+    except ImportError:
+        print("WARNING: requests not installed. Web API checks will be skipped.", file=sys.stderr)
+
+
+HEALTH_COLUMNS = """(
+        check_timestamp,
+        is_healthy,
+        farm_processes_count,
+        active_profiles,
+        web_api_responsive,
+        web_api_response_time_ms,
+        web_api_error,
+        system_load,
+        error_details,
+        metadata
+    )"""
+
+# Executed with prepare=True, so the server plans it once per connection
+INSERT_HEALTH_SQL = f"""
+    INSERT INTO farm_health_checks {HEALTH_COLUMNS}
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# TCP pre-check before the HTTP request, so a down dashboard fails fast
+API_CONNECT_TIMEOUT = 0.2
+
+# Held by the continuous monitor for its lifetime so only one scheduler runs
+MONITOR_LOCK_FILE = Path.home() / ".cache" / "ocr-dashboard-v3" / "monitor.lock"
+_MONITOR_LOCK = None
+
+# Rows buffered before a flush in continuous mode (1 = write every check)
+DEFAULT_BATCH_SIZE = 10
+# Upper bound on how long a buffered row may wait; caps the batch size for long intervals
+MAX_BUFFER_AGE_S = 60
+
+# Reconnect backoff for lost database connections
+DB_RETRY_ATTEMPTS = 3
+DB_RETRY_BASE_DELAY = 1.0
+DB_RETRY_MAX_DELAY = 60.0
+DB_RETRY_JITTER = 0.5
 
 
+@functools.lru_cache(maxsize=64)
 def _validate_web_url(url: str) -> bool:
     """Validate URL is safe for internal monitoring API calls."""
     try:
-        from urllib.parse import urlparse
-
         parsed = urlparse(url)
 
         if parsed.scheme not in ("http", "https"):
@@ -86,69 +147,195 @@ def _validate_web_url(url: str) -> bool:
         return False
 
 
+def _read_proc_file(path: str, limit: int | None = None) -> bytes:
+    """Read a /proc file with raw os calls, up to ``limit`` bytes if given."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if limit is not None:
+            return os.read(fd, limit)
+        chunks = []
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+_PROFILE_ENV_KEY = b"OCR_PROFILE_SUFFIX="
+
+
+def _profile_value_start(env_bytes: bytes) -> int:
+    """Offset of the OCR_PROFILE_SUFFIX value in an environ block, or -1."""
+    if env_bytes.startswith(_PROFILE_ENV_KEY):
+        return len(_PROFILE_ENV_KEY)
+    idx = env_bytes.find(b"\x00" + _PROFILE_ENV_KEY)
+    if idx == -1:
+        return -1
+    return idx + 1 + len(_PROFILE_ENV_KEY)
+
+
+def _profile_from_environ(env_bytes: bytes) -> str:
+    """Find OCR_PROFILE_SUFFIX in a NUL-separated environ block without splitting it."""
+    start = _profile_value_start(env_bytes)
+    if start == -1:
+        return ""
+    end = env_bytes.find(b"\x00", start)
+    # The last variable may lack a trailing NUL
+    value = env_bytes[start:] if end == -1 else env_bytes[start:end]
+    return value.decode("utf-8", "ignore")
+
+
+def _read_environ(pid: str) -> bytes:
+    """Read /proc/<pid>/environ only as far as the end of OCR_PROFILE_SUFFIX."""
+    fd = os.open(f"/proc/{pid}/environ", os.O_RDONLY)
+    try:
+        buf = b""
+        while chunk := os.read(fd, 4096):
+            buf += chunk
+            start = _profile_value_start(buf)
+            if start != -1 and buf.find(b"\x00", start) != -1:
+                break
+        return buf
+    finally:
+        os.close(fd)
+
+
+def _open_proc_fd(path: str) -> int | None:
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+
+def _meminfo_kb(buf: bytes, key: bytes) -> int:
+    """Parse the kB value after ``key`` in a raw /proc/meminfo buffer."""
+    idx = buf.find(key)
+    if idx == -1:
+        return 0
+    start = idx + len(key)
+    return int(buf[start : buf.find(b"\n", start)].split()[0])
+
+
 class FarmHealthMonitor:
     """Monitor OCR farm health and log to database."""
 
-    def __init__(self, pg_dsn: str, web_url: str = "http://localhost:9090"):
+    def __init__(self, pg_dsn: str, web_url: str = "http://localhost:9090", batch_size: int = 1):
+        _load_dependencies()
         self.pg_dsn = pg_dsn
         if not _validate_web_url(web_url):
             raise ValueError(f"Invalid or unsafe web URL: {web_url}")
         self.web_url = web_url.rstrip("/")
+        parsed = urlparse(self.web_url)
+        self._web_addr = (
+            parsed.hostname,
+            parsed.port or (443 if parsed.scheme == "https" else 80),
+        )
+        # Kept open for the monitor's lifetime; each check is a pread, not open/read/close
+        self._stat_fd = _open_proc_fd("/proc/stat")
+        self._meminfo_fd = _open_proc_fd("/proc/meminfo")
+        self._prev_cpu: tuple[int, int] | None = None
+        self._db = None
+        self._buffer: list[tuple] = []
+        self._buffer_limit = max(1, batch_size)
+        self._http = None
+        if HAS_REQUESTS:
+            # Keep-alive session: one pooled connection reused across checks
+            self._http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            self._http.mount("http://", adapter)
+            self._http.mount("https://", adapter)
 
     def _get_connection(self):
+        """Return the persistent autocommit connection, connecting on first use."""
+        if self._db is not None and not self._db.closed:
+            return self._db
         try:
-            return psycopg2.connect(self.pg_dsn)
+            conn = psycopg.connect(self.pg_dsn, autocommit=True)
         except Exception as e:
             print(f"ERROR: Failed to connect to database: {e}", file=sys.stderr)
             return None
+        self._db = conn
+        return conn
+
+    def _close_db(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def close(self) -> None:
+        self.flush()
+        self._close_db()
+        if self._http is not None:
+            self._http.close()
 
     def _check_farm_processes(self) -> tuple[int, list[str]]:
         processes = []
         profiles = []
 
-        proc_root = Path("/proc")
-        if not proc_root.exists():
+        try:
+            proc_entries = os.scandir("/proc")
+        except OSError:
             return 0, []
 
-        for entry in proc_root.iterdir():
-            if not entry.name.isdigit():
-                continue
-
-            try:
-                cmdline_file = entry / "cmdline"
-                if not cmdline_file.exists():
-                    continue
-
-                cmdline = cmdline_file.read_bytes()
-                if b"run.py" not in cmdline:
+        with proc_entries:
+            for entry in proc_entries:
+                if not entry.name.isdigit():
                     continue
 
-                processes.append(int(entry.name))
-
                 try:
-                    environ_file = entry / "environ"
-                    if environ_file.exists():
-                        env_bytes = environ_file.read_bytes()
-                        for item in env_bytes.split(b"\x00"):
-                            if item.startswith(b"OCR_PROFILE_SUFFIX="):
-                                profile = item.split(b"=", 1)[1].decode("utf-8", "ignore")
-                                if profile:
-                                    profiles.append(profile)
-                                break
+                    # comm is one short read; only Python processes can be run.py workers
+                    if not _read_proc_file(f"/proc/{entry.name}/comm", 16).startswith(b"python"):
+                        continue
+
+                    cmdline = _read_proc_file(f"/proc/{entry.name}/cmdline")
+                    if b"run.py" not in cmdline:
+                        continue
+
+                    processes.append(int(entry.name))
+
+                    try:
+                        env_bytes = _read_environ(entry.name)
+                        profile = _profile_from_environ(env_bytes)
+                        if profile:
+                            profiles.append(profile)
+                    except Exception:
+                        pass
                 except Exception:
-                    pass
-            except Exception:
-                continue
+                    continue
 
         return len(processes), profiles
 
     def _check_web_api(self, process_count: int = 0) -> tuple[bool, int | None, str | None]:
+        return self._judge_web_api(self._query_web_api(), process_count)
+
+    @staticmethod
+    def _judge_web_api(
+        result: tuple[bool, int | None, str | None, int | None], process_count: int
+    ) -> tuple[bool, int | None, str | None]:
+        """Flag API blindness once the process count is known."""
+        ok, response_time_ms, error, api_profile_count = result
+        if ok and process_count > 0 and api_profile_count == 0:
+            return (
+                False,
+                response_time_ms,
+                "CRITICAL: API Blindness - processes running but no profiles in API response",
+            )
+        return ok, response_time_ms, error
+
+    def _query_web_api(self) -> tuple[bool, int | None, str | None, int | None]:
+        """Fetch /api/profiles; also returns how many profiles the API reported."""
         if not HAS_REQUESTS:
-            return False, None, "requests library not available"
+            return False, None, "requests library not available", None
+
+        try:
+            with socket.create_connection(self._web_addr, timeout=API_CONNECT_TIMEOUT):
+                pass
+        except OSError as e:
+            return False, None, f"TCP connect failed: {str(e)[:100]}", None
 
         try:
             start_time = time.time()
-            response = requests.get(f"{self.web_url}/api/profiles", timeout=5)
+            response = self._http.get(f"{self.web_url}/api/profiles", timeout=5)
             response_time_ms = int((time.time() - start_time) * 1000)
 
             if 200 <= response.status_code < 300:
@@ -156,59 +343,62 @@ class FarmHealthMonitor:
                     data = response.json()
 
                     if "profiles" not in data:
-                        return False, response_time_ms, "Invalid API schema: missing 'profiles' key"
-
-                    if process_count > 0 and len(data["profiles"]) == 0:
                         return (
                             False,
                             response_time_ms,
-                            "CRITICAL: API Blindness - processes running but no profiles in API response",
+                            "Invalid API schema: missing 'profiles' key",
+                            None,
                         )
 
-                    return True, response_time_ms, None
+                    return True, response_time_ms, None, len(data["profiles"])
                 except (json.JSONDecodeError, ValueError) as e:
-                    return False, response_time_ms, f"Invalid JSON response: {str(e)[:100]}"
-            return False, response_time_ms, f"HTTP {response.status_code}"
+                    return False, response_time_ms, f"Invalid JSON response: {str(e)[:100]}", None
+            return False, response_time_ms, f"HTTP {response.status_code}", None
         except requests.exceptions.Timeout:
-            return False, None, "Request timeout (>5s)"
+            return False, None, "Request timeout (>5s)", None
         except requests.exceptions.ConnectionError as e:
-            return False, None, f"Connection error: {str(e)[:100]}"
+            return False, None, f"Connection error: {str(e)[:100]}", None
         except Exception as e:
-            return False, None, f"Error: {str(e)[:100]}"
+            return False, None, f"Error: {str(e)[:100]}", None
+
+    def _read_cpu_times(self) -> tuple[int, int] | None:
+        """Return (total, idle) jiffies from the aggregate cpu line of /proc/stat."""
+        if self._stat_fd is None:
+            return None
+        try:
+            buf = os.pread(self._stat_fd, 256, 0)
+            cpu_values = [int(x) for x in buf[: buf.index(b"\n")].split()[1:]]
+        except (OSError, ValueError):
+            return None
+        return sum(cpu_values), cpu_values[3]
 
     def _get_system_load(self) -> dict:
         metrics: dict[str, float | int] = {}
 
-        try:
-            with open("/proc/stat", encoding="utf-8") as f:
-                cpu_line = f.readline()
-                cpu_values = [int(x) for x in cpu_line.split()[1:]]
-                cpu_total = sum(cpu_values)
-                cpu_idle = cpu_values[3]
-                if cpu_total > 0:
-                    metrics["cpu_percent"] = round(100 * (1 - cpu_idle / cpu_total), 2)
-        except Exception:
-            pass
+        # CPU usage since the previous check (or since boot on the first one)
+        cpu = self._read_cpu_times()
+        if cpu is not None:
+            total, idle = cpu
+            prev, self._prev_cpu = self._prev_cpu, cpu
+            if prev is not None and total > prev[0]:
+                total -= prev[0]
+                idle -= prev[1]
+            if total > 0:
+                metrics["cpu_percent"] = round(100 * (1 - idle / total), 2)
 
-        try:
-            with open("/proc/meminfo", encoding="utf-8") as f:
-                meminfo = {}
-                for line in f:
-                    parts = line.split(":")
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = int(parts[1].strip().split()[0])
-                        meminfo[key] = value
-
-                total = meminfo.get("MemTotal", 0)
-                available = meminfo.get("MemAvailable", 0)
+        if self._meminfo_fd is not None:
+            try:
+                # MemTotal and MemAvailable are within the first few lines
+                buf = os.pread(self._meminfo_fd, 512, 0)
+                total = _meminfo_kb(buf, b"MemTotal:")
+                available = _meminfo_kb(buf, b"MemAvailable:")
                 if total > 0:
                     used = total - available
                     metrics["memory_percent"] = round(100 * used / total, 2)
                     metrics["memory_used_mb"] = round(used / 1024, 0)
                     metrics["memory_total_mb"] = round(total / 1024, 0)
-        except Exception:
-            pass
+            except (OSError, ValueError):
+                pass
 
         try:
             st = os.statvfs("/")
@@ -233,51 +423,64 @@ class FarmHealthMonitor:
         system_load: dict,
         error_details: str | None,
     ) -> bool:
-        conn = self._get_connection()
-        if not conn:
-            return False
+        """Buffer a health row; written once the buffer reaches the batch size."""
+        # Rows may be written well after the check, so record when it ran
+        self._buffer.append(
+            (
+                datetime.now(UTC),
+                is_healthy,
+                process_count,
+                Json(active_profiles),
+                web_api_ok,
+                web_api_time,
+                web_api_error,
+                Json(system_load),
+                error_details,
+                Json({"web_url": self.web_url}),
+            )
+        )
+        if len(self._buffer) < self._buffer_limit:
+            return True
+        return self.flush()
 
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO farm_health_checks (
-                        is_healthy,
-                        farm_processes_count,
-                        active_profiles,
-                        web_api_responsive,
-                        web_api_response_time_ms,
-                        web_api_error,
-                        system_load,
-                        error_details,
-                        metadata
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        is_healthy,
-                        process_count,
-                        psycopg2.extras.Json(active_profiles),
-                        web_api_ok,
-                        web_api_time,
-                        web_api_error,
-                        psycopg2.extras.Json(system_load),
-                        error_details,
-                        psycopg2.extras.Json({"web_url": self.web_url}),
-                    ),
-                )
-            conn.commit()
+    def flush(self) -> bool:
+        """Write all buffered health rows in a single round-trip."""
+        if not self._buffer:
             return True
-        except Exception as e:
-            print(f"ERROR: Failed to insert health record: {e}", file=sys.stderr)
-            conn.rollback()
-            return False
-        finally:
-            conn.close()
+        rows, self._buffer = self._buffer, []
+
+        for attempt in range(DB_RETRY_ATTEMPTS):
+            if attempt:
+                delay = min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                time.sleep(delay + random.uniform(0, DB_RETRY_JITTER))
+
+            conn = self._get_connection()
+            if not conn:
+                continue
+
+            try:
+                # Pipeline mode sends every buffered row before waiting on any result
+                with conn.pipeline(), conn.cursor() as cur:
+                    for row in rows:
+                        cur.execute(INSERT_HEALTH_SQL, row, prepare=True)
+                return True
+            except psycopg.OperationalError as e:
+                print(f"ERROR: Database connection lost: {e}", file=sys.stderr)
+                self._close_db()
+            except Exception as e:
+                print(f"ERROR: Failed to insert health record: {e}", file=sys.stderr)
+                return False
+        return False
 
     def run_once(self) -> tuple[bool, str]:
-        process_count, profiles = self._check_farm_processes()
-        web_ok, web_time, web_error = self._check_web_api(process_count)
-        system_load = self._get_system_load()
+        # The three probes are independent; the HTTP round-trip overlaps the /proc scan
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            proc_future = executor.submit(self._check_farm_processes)
+            api_future = executor.submit(self._query_web_api)
+            load_future = executor.submit(self._get_system_load)
+            process_count, profiles = proc_future.result()
+            web_ok, web_time, web_error = self._judge_web_api(api_future.result(), process_count)
+            system_load = load_future.result()
 
         is_healthy = process_count > 0 and web_ok
         error_details = None
@@ -310,6 +513,30 @@ class FarmHealthMonitor:
         return ok, summary
 
 
+def _acquire_monitor_lock() -> bool:
+    """Take the single-instance lock; False if another monitor already holds it."""
+    global _MONITOR_LOCK  # noqa: PLW0603
+    MONITOR_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    lock = open(MONITOR_LOCK_FILE, "a+")  # noqa: SIM115
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return False
+    lock.seek(0)
+    lock.truncate()
+    lock.write(f"{os.getpid()}\n")
+    lock.flush()
+    _MONITOR_LOCK = lock
+    return True
+
+
+def _exit_on_sigterm(_signum, _frame) -> None:
+    # Ignore repeated signals so they cannot interrupt the final flush
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    sys.exit(0)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="OCR farm health monitor")
     parser.add_argument("--once", action="store_true", help="Run single check and exit")
@@ -324,6 +551,15 @@ def main() -> int:
         default=os.environ.get("WEB_DASHBOARD_URL", "http://localhost:9090"),
         help="Dashboard base URL for API checks",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.environ.get("FARM_HEALTH_BATCH_SIZE", str(DEFAULT_BATCH_SIZE))),
+        help=(
+            "Health rows buffered per database write in continuous mode "
+            f"(capped at {MAX_BUFFER_AGE_S}s worth of checks)"
+        ),
+    )
     args = parser.parse_args()
 
     pg_dsn = os.environ.get("OCR_PG_DSN")
@@ -331,22 +567,43 @@ def main() -> int:
         print("ERROR: OCR_PG_DSN environment variable not set", file=sys.stderr)
         return 1
 
-    monitor = FarmHealthMonitor(pg_dsn=pg_dsn, web_url=args.web_url)
+    if not args.once and not _acquire_monitor_lock():
+        print(
+            f"ERROR: Another farm health monitor is running ({MONITOR_LOCK_FILE})", file=sys.stderr
+        )
+        return 2
+
+    interval = max(10, int(args.interval))
+    # A single check is written immediately; only continuous mode buffers rows. Rows are
+    # lost if the process dies before a flush and last_check lags by the same amount, so
+    # the buffer never spans more than MAX_BUFFER_AGE_S of checks.
+    batch_size = 1 if args.once else min(args.batch_size, max(1, MAX_BUFFER_AGE_S // interval))
+    monitor = FarmHealthMonitor(pg_dsn=pg_dsn, web_url=args.web_url, batch_size=batch_size)
+    atexit.register(monitor.close)
 
     if args.once:
         ok, summary = monitor.run_once()
         print(summary, flush=True)
         return 0 if ok else 1
 
-    interval = max(10, int(args.interval))
-    print(f"Starting farm health monitor (interval: {interval}s)", flush=True)
+    print(f"Starting farm health monitor (interval: {interval}s, batch: {batch_size})", flush=True)
+    # Exit through SystemExit on SIGTERM so atexit flushes the buffered rows
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
 
     try:
+        # Monotonic deadlines keep the cadence fixed regardless of how long a check takes
+        next_tick = time.monotonic()
         while True:
+            next_tick += interval
             _, summary = monitor.run_once()
             timestamp = datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S")
             print(f"{timestamp} {summary}", flush=True)
-            time.sleep(interval)
+            sleep_s = next_tick - time.monotonic()
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+            else:
+                # Fell behind: resync instead of firing a burst of catch-up checks
+                next_tick = time.monotonic()
     except KeyboardInterrupt:
         print("Stopped by user")
         return 0
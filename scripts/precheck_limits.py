@@ -7,100 +7,262 @@ banner, and writes pause files used by OCR runners.
 """
 
 import argparse
+import atexit
+import bisect
+import contextlib
+import functools
+import importlib.util
 import json
 import os
-import platform
+import queue
 import re
 import shutil
+import socket
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+import uuid
+import weakref
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any
-
-from playwright.sync_api import sync_playwright
+from typing import TYPE_CHECKING, Any
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from ocr_engine.ocr.engine.db_locking import DbLockingManager
 from ocr_engine.ocr.engine.pro_limit_handler import (
     PRO_LIMIT_TEXT_RE,
     ProLimitHandler,
 )
 from ocr_engine.utils.path_security import validate_cache_dir, validate_profiles_dir
 
-# Database support (optional)
+if TYPE_CHECKING:
+    from ocr_engine.ocr.engine.db_locking import DbLockingManager
+
+# Database support (optional). Playwright, psycopg2 and DbLockingManager (which
+# imports psycopg2) are imported on first use so --help and DB-less runs start fast.
+HAS_PSYCOPG2 = importlib.util.find_spec("psycopg2") is not None
+
 try:
-    import psycopg2
-    import psycopg2.extras
-    HAS_PSYCOPG2 = True
-except ImportError:
-    HAS_PSYCOPG2 = False
+    import orjson
 
-import socket
-import uuid
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Database logging configuration
 DB_DSN = os.environ.get("OCR_PG_DSN")
 DB_LOG_ENABLED = bool(DB_DSN)
+DB_POOL_MAX_CONNECTIONS = 8
+
+_HOSTNAME = socket.gethostname()
+
+_LIMIT_CHECK_COLUMNS = """
+    run_id, check_id, profile_name, profile_path, profile_type,
+    is_limited, reset_time, limit_detected_method,
+    model_initial, model_after_switch, model_final, model_is_pro,
+    model_switch_needed, model_switch_success, model_switch_attempts,
+    session_valid, login_detected, login_provider, account_email,
+    chat_opened, chat_ready, prompt_box_found, prompt_sent, prompt_response_received,
+    status, error_message, error_stage,
+    check_duration_ms, browser_launch_ms, navigation_ms, page_load_ms,
+    login_check_ms, model_detect_ms, model_switch_ms,
+    prompt_send_ms, prompt_response_ms, limit_detect_ms, screenshot_ms,
+    worker_host, worker_ip, worker_type, worker_os, worker_python_version, playwright_version,
+    browser_headed, browser_timeout_ms, browser_user_agent, browser_viewport_width, browser_viewport_height,
+    screenshot_path, screenshot_saved, screenshot_size_bytes,
+    source_application, triggered_by,
+    pause_written, pause_until, pause_cleared, pause_reason,
+    page_title, page_language, limit_banner_text, menu_text,
+    retry_count, total_attempts,
+    metadata, timings_breakdown, raw_body_text_sample,
+    checked_at
+"""
+_LIMIT_CHECK_FIELDS = tuple(c.strip() for c in _LIMIT_CHECK_COLUMNS.split(","))
+# Queued rows travel as one jsonb array that the server expands into records,
+# so any batch size is a single parameter
+_INSERT_SQL = (
+    f"INSERT INTO limit_checks ({_LIMIT_CHECK_COLUMNS}) "
+    f"SELECT {_LIMIT_CHECK_COLUMNS} FROM jsonb_populate_recordset(NULL::limit_checks, $1::jsonb)"
+)
+# Prepared once per backend; later flushes only ship the payload
+_INSERT_STMT = "limit_check_ins"
+_PREPARE_INSERT_SQL = f"PREPARE {_INSERT_STMT} AS {_INSERT_SQL}"
+_EXECUTE_INSERT_SQL = f"EXECUTE {_INSERT_STMT} (%s)"
+
+# Batches do not rotate within a precheck run, so the jobs/ scan is reused
+LATEST_BATCH_TTL = 30  # seconds
+_LATEST_BATCH_CACHE: tuple[float, Path | None] = (0.0, None)
+_LATEST_BATCH_LOCK = threading.Lock()
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_PREPARED_BACKENDS: set[int] = set()
+_PENDING: list[dict[str, Any]] = []
 
 _MODEL_BUTTON_RE = re.compile(r"(Szybki|Fast|Flash|Pro|1\.5\s*Pro|2\.0\s*Pro|Thinking|Myślący)", re.IGNORECASE)
 _PRO_MODEL_RE = re.compile(r"(\bPro\b|1\.5\s*Pro|2\.0\s*Pro)", re.IGNORECASE)
 _FAST_MODEL_RE = re.compile(r"(Szybki|Fast|Flash|1\.5\s*Flash|2\.0\s*Flash)", re.IGNORECASE)
+# Playwright timeouts (ms). Actions default to DEFAULT_ACTION_TIMEOUT_MS instead
+# of Playwright's 30 s; screenshots get longer since full-page captures are slow.
+DEFAULT_ACTION_TIMEOUT_MS = 5000
+PROMPT_BOX_TIMEOUT_MS = 4000  # first probe, right after navigation while the app hydrates
+UI_SETTLED_TIMEOUT_MS = 1500  # later lookups on an already loaded page
+SCREENSHOT_TIMEOUT_MS = 15000
+# Banner polls after the test prompt, in seconds since it was sent. Until a profile
+# has POLL_MIN_SAMPLES recorded detections the old 3/5/7/9/11 s ladder is used.
+POLL_HISTORY_FILE = "poll_hist.json"
+POLL_HISTORY_SIZE = 50  # detection times kept per profile
+POLL_MIN_SAMPLES = 5
+POLL_COUNT = 5
+POLL_BUDGET_S = 35.0
+POLL_GRID_S = 0.5
+POLL_FIRST_MIN_S = 3.0  # earlier polls can still see Pro before the limit swaps the model
+POLL_FIRST_MAX_S = 5.0  # a first poll that sees Pro ends the check, so this bounds the OK path
+POLL_WAKE_INTERVAL_MS = 250  # in-page banner check while waiting for the next poll
+_DEFAULT_POLL_TIMES = (3.0, 8.0, 15.0, 24.0, 35.0)
+_POLL_HISTORY_LOCK = threading.Lock()
+# Writes debug screenshots off the check threads; pending writes finish before exit
+_SCREENSHOT_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="debug-screenshot")
+# The limit banner sits at the top of the chat, so proofs cover the viewport only;
+# --full-proof restores full-page captures for debugging
+FULL_PAGE_PROOF = False
+# Requests that never affect banner or menu detection; --no-block-resources disables this.
+# Stylesheets still load: visibility checks and proof screenshots depend on layout.
+BLOCK_RESOURCES = True
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+_BLOCKED_HOSTS = ("googletagmanager.com", "google-analytics.com", "doubleclick.net")
+
+_PROMPT_BOX_SELECTOR = ", ".join(
+    [
+        'div[contenteditable="true"]',
+        'rich-textarea [contenteditable="true"]',
+        "textarea[placeholder]",
+        ".ql-editor",
+    ]
+)
+
+# Fallbacks when no button text names a model; one query instead of five
+_MODEL_BUTTON_ATTR_SELECTOR = ", ".join(
+    [
+        "button[aria-label*='model' i]",
+        "[role='button'][aria-label*='model' i]",
+        "button[aria-label*='modelu' i]",
+        "[role='button'][aria-label*='modelu' i]",
+        "[data-testid*='model' i]",
+    ]
+)
+# Locator that last found the model button, per page; re-checked before reuse
+_MODEL_BUTTON_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_MODEL_BUTTON_CACHE_LOCK = threading.Lock()
+# Same lookup order as _find_model_button, read in one evaluate instead of 3-4 calls
+_DETECT_MODEL_LABEL_JS = """([pattern, attrSelector]) => {
+    const re = new RegExp(pattern, 'i');
+    const groups = [
+        [...document.querySelectorAll('button')].filter(el => re.test(el.textContent || '')),
+        [...document.querySelectorAll("[role='button']")].filter(el => re.test(el.textContent || '')),
+        [...document.querySelectorAll(attrSelector)],
+    ];
+    const found = groups.find(g => g.length > 0);
+    if (!found) return null;
+    const btn = found[found.length - 1];
+    const r = btn.getBoundingClientRect();
+    if (r.width === 0 || r.height === 0) return null;
+    return (btn.innerText || '').trim() || (btn.getAttribute('aria-label') || '').trim() || null;
+}"""
+_MODEL_MENU_TEXT_JS = """() => {
+    const menu = document.querySelector("div[role='menu'], div[role='listbox']") || document.body;
+    return menu.innerText || '';
+}"""
+_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9_.-]+")
+_LOGIN_RE = re.compile(r"Zaloguj się|Sign in|Log in|Create account|Załóż konto", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+RAW_BODY_SAMPLE_CHARS = 500
+STATUS_WRITE_INTERVAL = 2.0  # seconds between in-progress status snapshots
+# One JSON object per run; main() clears it at the start of every run
+HISTORY_FILE = "limit_precheck_history.jsonl"
+# The page text is matched in the browser; only the results (and the full text when
+# the limit banner is present, for the reset time) cross the CDP bridge
+_LIMIT_TEXT_JS = """(pattern) => {
+    const text = document.body ? document.body.innerText : '';
+    return new RegExp(pattern, 'i').test(text) ? text : null;
+}"""
+# Per-poll read after the test prompt: limit text and model label in one round-trip
+_POLL_SIGNALS_JS = f"""([limitPattern, labelArgs]) => ({{
+    limit_text: ({_LIMIT_TEXT_JS})(limitPattern),
+    label: ({_DETECT_MODEL_LABEL_JS})(labelArgs),
+}})"""
+# Ends a poll wait early once the banner is on the page
+_LIMIT_SHOWN_JS = f"""(limitPattern) => ({_LIMIT_TEXT_JS})(limitPattern) !== null"""
+_PAGE_SIGNALS_JS = """([limitPattern, loginPattern, emailPattern, sampleChars]) => {
+    const text = document.body ? document.body.innerText : '';
+    const email = text.match(new RegExp(emailPattern));
+    return {
+        sample: text.slice(0, sampleChars),
+        login: new RegExp(loginPattern, 'i').test(text),
+        email: email ? email[0] : null,
+        limit_text: new RegExp(limitPattern, 'i').test(text) ? text : null,
+    };
+}"""
+
+
+_CHECK_DEFAULTS: dict[str, Any] = {
+    "limit_detected_method": "none",
+    "model_initial": "unknown",
+    "model_after_switch": "unknown",
+    "model_switch_needed": False,
+    "model_switch_success": False,
+    "model_switch_attempts": 0,
+    "session_valid": True,
+    "login_detected": False,
+    "chat_opened": False,
+    "chat_ready": False,
+    "prompt_box_found": False,
+    "prompt_sent": False,
+    "prompt_response_received": False,
+    "status": "OK",
+    "error_message": "",
+    "error_stage": "none",
+    "check_duration_ms": 0,
+    "browser_launch_ms": 0,
+    "navigation_ms": 0,
+    "page_load_ms": 0,
+    "login_check_ms": 0,
+    "model_detect_ms": 0,
+    "model_switch_ms": 0,
+    "prompt_send_ms": 0,
+    "prompt_response_ms": 0,
+    "limit_detect_ms": 0,
+    "screenshot_ms": 0,
+    "worker_type": "local",
+    "browser_timeout_ms": 0,
+    "browser_user_agent": "unknown",
+    "browser_viewport_width": 0,
+    "browser_viewport_height": 0,
+    "screenshot_path": "",
+    "screenshot_size_bytes": 0,
+    "triggered_by": "",
+    "pause_written": False,
+    "pause_cleared": False,
+    "pause_reason": "none",
+    "page_title": "",
+    "page_language": "",
+    "limit_banner_text": "",
+    "menu_text": "",
+    "retry_count": 0,
+    "total_attempts": 1,
+    "raw_body_text_sample": "",
+}
 
 
 def _normalize_check_data(d: dict[str, Any]) -> dict[str, Any]:
-    normalized = dict(d or {})
-    normalized.setdefault("limit_detected_method", "none")
-    normalized.setdefault("model_initial", "unknown")
-    normalized.setdefault("model_after_switch", "unknown")
+    normalized = {**_CHECK_DEFAULTS, **(d or {})}
     normalized.setdefault("model_final", normalized.get("model_initial") or "unknown")
-    normalized.setdefault("model_switch_needed", False)
-    normalized.setdefault("model_switch_success", False)
-    normalized.setdefault("model_switch_attempts", 0)
-    normalized.setdefault("session_valid", True)
-    normalized.setdefault("login_detected", False)
     if normalized.get("login_provider") is None:
         normalized["login_provider"] = "google" if normalized.get("login_detected") else "none"
     if normalized.get("account_email") is None:
         normalized["account_email"] = ""
-    normalized.setdefault("chat_opened", False)
-    normalized.setdefault("chat_ready", False)
-    normalized.setdefault("prompt_box_found", False)
-    normalized.setdefault("prompt_sent", False)
-    normalized.setdefault("prompt_response_received", False)
-    normalized.setdefault("status", "OK")
-    normalized.setdefault("error_message", "")
-    normalized.setdefault("error_stage", "none")
-    normalized.setdefault("check_duration_ms", 0)
-    normalized.setdefault("browser_launch_ms", 0)
-    normalized.setdefault("navigation_ms", 0)
-    normalized.setdefault("page_load_ms", 0)
-    normalized.setdefault("login_check_ms", 0)
-    normalized.setdefault("model_detect_ms", 0)
-    normalized.setdefault("model_switch_ms", 0)
-    normalized.setdefault("prompt_send_ms", 0)
-    normalized.setdefault("prompt_response_ms", 0)
-    normalized.setdefault("limit_detect_ms", 0)
-    normalized.setdefault("screenshot_ms", 0)
-    normalized.setdefault("worker_type", "local")
-    normalized.setdefault("browser_timeout_ms", 0)
-    normalized.setdefault("browser_user_agent", "unknown")
-    normalized.setdefault("browser_viewport_width", 0)
-    normalized.setdefault("browser_viewport_height", 0)
-    normalized.setdefault("screenshot_path", "")
-    normalized.setdefault("screenshot_size_bytes", 0)
-    normalized.setdefault("triggered_by", "")
-    normalized.setdefault("pause_written", False)
-    normalized.setdefault("pause_cleared", False)
-    normalized.setdefault("pause_reason", "none")
-    normalized.setdefault("page_title", "")
-    normalized.setdefault("page_language", "")
-    normalized.setdefault("limit_banner_text", "")
-    normalized.setdefault("menu_text", "")
-    normalized.setdefault("retry_count", 0)
-    normalized.setdefault("total_attempts", 1)
-    normalized.setdefault("raw_body_text_sample", "")
     if normalized.get("metadata") is None:
         normalized["metadata"] = {}
     if normalized.get("timings_breakdown") is None:
@@ -133,9 +295,11 @@ def _iter_profiles(base_dir: Path, only: set[str] | None):
     return profiles
 
 
-def _get_db_manager(profile_name: str) -> DbLockingManager | None:
+def _get_db_manager(profile_name: str) -> "DbLockingManager | None":
     if not DB_DSN:
         return None
+    from ocr_engine.ocr.engine.db_locking import DbLockingManager  # noqa: PLC0415
+
     pg_table = os.environ.get("OCR_PG_TABLE", "public.ocr_raw_texts")
     db = DbLockingManager(pg_table=pg_table, profile_name=profile_name, enabled=True)
     db.init_artifacts_table()
@@ -159,21 +323,26 @@ def _clear_pause(cache_dir: Path, profile_name: str):
     db.set_profile_state(profile_name, is_paused=False, pause_until=None, pause_reason=None)
 
 
-def _log_check_to_db(check_data: dict[str, Any]) -> bool:
-    """Log a limit check result to PostgreSQL database."""
-    if not DB_LOG_ENABLED or not HAS_PSYCOPG2:
-        return False
+def _get_pool():
+    global _POOL  # noqa: PLW0603
+    with _POOL_LOCK:
+        if _POOL is None:
+            from psycopg2.pool import ThreadedConnectionPool  # noqa: PLC0415
 
-    try:
-        conn = psycopg2.connect(DB_DSN)
-    except Exception as e:
-        print(f"⚠️ DB connection failed: {e}")
-        return False
+            _POOL = ThreadedConnectionPool(1, DB_POOL_MAX_CONNECTIONS, DB_DSN)
+        return _POOL
 
-    d = _normalize_check_data(check_data)
-    model_final = d.get("model_final") or d.get("model_detected")
-    model_is_pro = bool(model_final and re.search(_PRO_MODEL_RE, model_final))
-    worker_host = socket.gethostname()
+
+def _clip(text: str | None, limit: int) -> str | None:
+    return text[:limit] if text else None
+
+
+@functools.lru_cache(maxsize=1)
+def _worker_info() -> tuple[str, str | None, str, str, str]:
+    """Host, IP, OS, Python and Playwright versions; constant for the process."""
+    import platform  # noqa: PLC0415
+
+    worker_host = _HOSTNAME
     worker_ip = None
     try:
         worker_ip = socket.gethostbyname(worker_host) if worker_host else None
@@ -186,149 +355,212 @@ def _log_check_to_db(check_data: dict[str, Any]) -> bool:
     except Exception:
         pw_version = "unknown"
 
+    return worker_host, worker_ip, platform.platform(), platform.python_version(), pw_version
+
+
+def _build_check_row(check_data: dict[str, Any]) -> dict[str, Any]:
+    """Build the limit_checks record, keyed by column, for one check result."""
+    d = _normalize_check_data(check_data)
+    model_final = d.get("model_final") or d.get("model_detected")
+    model_is_pro = bool(model_final and _PRO_MODEL_RE.search(model_final))
+    worker_host, worker_ip, worker_os, worker_python_version, pw_version = _worker_info()
+
+    values = (
+        d.get("run_id"),
+        str(uuid.uuid4()),
+        d.get("profile_name"),
+        d.get("profile_path"),
+        d.get("profile_type", "gemini"),
+        d.get("is_limited", False),
+        d.get("reset_time"),
+        _clip(d.get("limit_detected_method"), 64),
+        _clip(d.get("model_initial"), 64),
+        _clip(d.get("model_after_switch"), 64),
+        _clip(model_final, 64),
+        model_is_pro,
+        d.get("model_switch_needed", False),
+        d.get("model_switch_success"),
+        d.get("model_switch_attempts", 0),
+        d.get("session_valid"),
+        d.get("login_detected"),
+        d.get("login_provider"),
+        d.get("account_email"),
+        d.get("chat_opened"),
+        d.get("chat_ready"),
+        d.get("prompt_box_found"),
+        d.get("prompt_sent"),
+        d.get("prompt_response_received"),
+        d.get("status"),
+        d.get("error_message"),
+        d.get("error_stage"),
+        d.get("check_duration_ms"),
+        d.get("browser_launch_ms"),
+        d.get("navigation_ms"),
+        d.get("page_load_ms"),
+        d.get("login_check_ms"),
+        d.get("model_detect_ms"),
+        d.get("model_switch_ms"),
+        d.get("prompt_send_ms"),
+        d.get("prompt_response_ms"),
+        d.get("limit_detect_ms"),
+        d.get("screenshot_ms"),
+        worker_host,
+        worker_ip,
+        d.get("worker_type", "local"),
+        worker_os,
+        worker_python_version,
+        pw_version,
+        d.get("browser_headed", False),
+        d.get("browser_timeout_ms"),
+        d.get("browser_user_agent"),
+        d.get("browser_viewport_width"),
+        d.get("browser_viewport_height"),
+        d.get("screenshot_path"),
+        bool(d.get("screenshot_path")),
+        d.get("screenshot_size_bytes"),
+        d.get("source_application", "precheck_script"),
+        d.get("triggered_by"),
+        d.get("pause_written", False),
+        d.get("pause_until"),
+        d.get("pause_cleared", False),
+        d.get("pause_reason"),
+        d.get("page_title"),
+        d.get("page_language"),
+        _clip(d.get("limit_banner_text"), 2000),
+        _clip(d.get("menu_text"), 2000),
+        d.get("retry_count", 0),
+        d.get("total_attempts", 1),
+        d.get("metadata") or {},
+        d.get("timings_breakdown") or {},
+        _clip(d.get("raw_body_text_sample"), 500),
+        datetime.now(UTC),
+    )
+    return dict(zip(_LIMIT_CHECK_FIELDS, values, strict=True))
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _queue_check(check_data: dict[str, Any]) -> None:
+    """Queue a limit check result for the next _flush_checks()."""
+    if not DB_LOG_ENABLED or not HAS_PSYCOPG2:
+        return
+    _PENDING.append(_build_check_row(check_data))
+
+
+def _flush_checks() -> bool:
+    """Write all queued limit check results to PostgreSQL in one transaction."""
+    global _PENDING
+    if not _PENDING:
+        return True
+    rows, _PENDING = _PENDING, []
+
+    try:
+        pool = _get_pool()
+        conn = pool.getconn()
+    except Exception as e:
+        print(f"⚠️ DB connection failed: {e}")
+        return False
+
+    backend_pid = None
+    discard = False
     try:
         with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO limit_checks (
-                    run_id, check_id, profile_name, profile_path, profile_type,
-                    is_limited, reset_time, limit_detected_method,
-                    model_initial, model_after_switch, model_final, model_is_pro,
-                    model_switch_needed, model_switch_success, model_switch_attempts,
-                    session_valid, login_detected, login_provider, account_email,
-                    chat_opened, chat_ready, prompt_box_found, prompt_sent, prompt_response_received,
-                    status, error_message, error_stage,
-                    check_duration_ms, browser_launch_ms, navigation_ms, page_load_ms,
-                    login_check_ms, model_detect_ms, model_switch_ms,
-                    prompt_send_ms, prompt_response_ms, limit_detect_ms, screenshot_ms,
-                    worker_host, worker_ip, worker_type, worker_os, worker_python_version, playwright_version,
-                    browser_headed, browser_timeout_ms, browser_user_agent, browser_viewport_width, browser_viewport_height,
-                    screenshot_path, screenshot_saved, screenshot_size_bytes,
-                    source_application, triggered_by,
-                    pause_written, pause_until, pause_cleared, pause_reason,
-                    page_title, page_language, limit_banner_text, menu_text,
-                    retry_count, total_attempts,
-                    metadata, timings_breakdown, raw_body_text_sample,
-                    checked_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s,
-                    %s, %s, %s,
-                    NOW()
-                )
-            """, (
-                d.get("run_id"),
-                str(uuid.uuid4()),
-                d.get("profile_name"),
-                d.get("profile_path"),
-                d.get("profile_type", "gemini"),
-                d.get("is_limited", False),
-                d.get("reset_time"),
-                d.get("limit_detected_method")[:64] if d.get("limit_detected_method") else None,
-                d.get("model_initial")[:64] if d.get("model_initial") else None,
-                d.get("model_after_switch")[:64] if d.get("model_after_switch") else None,
-                model_final[:64] if model_final else None,
-                model_is_pro,
-                d.get("model_switch_needed", False),
-                d.get("model_switch_success"),
-                d.get("model_switch_attempts", 0),
-                d.get("session_valid"),
-                d.get("login_detected"),
-                d.get("login_provider"),
-                d.get("account_email"),
-                d.get("chat_opened"),
-                d.get("chat_ready"),
-                d.get("prompt_box_found"),
-                d.get("prompt_sent"),
-                d.get("prompt_response_received"),
-                d.get("status"),
-                d.get("error_message"),
-                d.get("error_stage"),
-                d.get("check_duration_ms"),
-                d.get("browser_launch_ms"),
-                d.get("navigation_ms"),
-                d.get("page_load_ms"),
-                d.get("login_check_ms"),
-                d.get("model_detect_ms"),
-                d.get("model_switch_ms"),
-                d.get("prompt_send_ms"),
-                d.get("prompt_response_ms"),
-                d.get("limit_detect_ms"),
-                d.get("screenshot_ms"),
-                worker_host,
-                worker_ip,
-                d.get("worker_type", "local"),
-                platform.platform(),
-                platform.python_version(),
-                pw_version,
-                d.get("browser_headed", False),
-                d.get("browser_timeout_ms"),
-                d.get("browser_user_agent"),
-                d.get("browser_viewport_width"),
-                d.get("browser_viewport_height"),
-                d.get("screenshot_path"),
-                bool(d.get("screenshot_path")),
-                d.get("screenshot_size_bytes"),
-                d.get("source_application", "precheck_script"),
-                d.get("triggered_by"),
-                d.get("pause_written", False),
-                d.get("pause_until"),
-                d.get("pause_cleared", False),
-                d.get("pause_reason"),
-                d.get("page_title"),
-                d.get("page_language"),
-                d.get("limit_banner_text", "")[:2000] if d.get("limit_banner_text") else None,
-                d.get("menu_text", "")[:2000] if d.get("menu_text") else None,
-                d.get("retry_count", 0),
-                d.get("total_attempts", 1),
-                psycopg2.extras.Json(d.get("metadata") or {}),
-                psycopg2.extras.Json(d.get("timings_breakdown") or {}),
-                d.get("raw_body_text_sample", "")[:500] if d.get("raw_body_text_sample") else None,
-            ))
+            backend_pid = conn.get_backend_pid()
+            if backend_pid not in _PREPARED_BACKENDS:
+                cur.execute(_PREPARE_INSERT_SQL)
+                _PREPARED_BACKENDS.add(backend_pid)
+            cur.execute(_EXECUTE_INSERT_SQL, (json.dumps(rows, default=_json_default),))
         conn.commit()
         return True
     except Exception as e:
         print(f"⚠️ DB insert failed: {e}")
-        conn.rollback()
+        discard = bool(conn.closed)
+        if discard:
+            _PREPARED_BACKENDS.discard(backend_pid)
+        else:
+            conn.rollback()
         return False
     finally:
-        conn.close()
+        pool.putconn(conn, close=discard)
+
+
+def _latest_batch_dir() -> Path | None:
+    """Most recently modified batch under jobs/, cached for LATEST_BATCH_TTL seconds."""
+    global _LATEST_BATCH_CACHE  # noqa: PLW0603
+    now = time.monotonic()
+    with _LATEST_BATCH_LOCK:
+        cached_at, latest = _LATEST_BATCH_CACHE
+        if latest is not None and now - cached_at < LATEST_BATCH_TTL:
+            return latest
+        latest = None
+        jobs_dir = Path(__file__).resolve().parents[1] / "jobs"
+        if jobs_dir.exists():
+            with os.scandir(jobs_dir) as it:
+                newest = max((e for e in it if e.is_dir()), key=lambda e: e.stat().st_mtime, default=None)
+            if newest is not None:
+                latest = Path(newest.path)
+        _LATEST_BATCH_CACHE = (now, latest)
+        return latest
+
+
+def _ms_since(start_ns: int) -> int:
+    """Milliseconds elapsed since a time.monotonic_ns() reading."""
+    return (time.monotonic_ns() - start_ns) // 1_000_000
+
+
+def _fastcopy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, copying only when they are on different filesystems."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _report_screenshot_write(path: Path, future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        print(f"  Debug screenshot write failed: {path}: {exc}")
+
+
+def _save_debug_screenshot(page, path: Path) -> int:
+    """Capture a debug screenshot and queue it for writing; returns its size in bytes.
+
+    Only the capture needs the page, so the check can move on while the file is written.
+    A failed write is logged by the done-callback, after the check has recorded the path.
+    """
+    data = page.screenshot(type="jpeg", quality=70, full_page=True, timeout=SCREENSHOT_TIMEOUT_MS)
+    future = _SCREENSHOT_POOL.submit(path.write_bytes, data)
+    future.add_done_callback(functools.partial(_report_screenshot_write, path))
+    return len(data)
 
 
 def _write_limit_proof(page, profile_name: str, cache_dir: Path, run_id: str) -> tuple[str | None, int | None]:
-    safe_profile = re.sub(r"[^a-zA-Z0-9_.-]+", "_", profile_name)
+    safe_profile = _UNSAFE_RE.sub("_", profile_name)
     cache_path = cache_dir / f"limit_proof_{safe_profile}.jpg"
     cache_run_path = cache_dir / f"limit_proof_{safe_profile}_{run_id}.jpg"
     try:
-        page.screenshot(path=cache_path, type="jpeg", quality=70, full_page=True)
+        # Start a fresh inode: earlier proofs may still be hardlinked to this path
+        cache_path.unlink(missing_ok=True)
+        if FULL_PAGE_PROOF:
+            page.screenshot(path=cache_path, type="jpeg", quality=70, full_page=True, timeout=SCREENSHOT_TIMEOUT_MS)
+        else:
+            page.screenshot(path=cache_path, type="jpeg", quality=60, full_page=False, timeout=SCREENSHOT_TIMEOUT_MS)
         if cache_path.exists():
-            shutil.copy2(cache_path, cache_run_path)
+            _fastcopy(cache_path, cache_run_path)
     except Exception:
         return None, None
 
     try:
-        repo_root = Path(__file__).resolve().parents[1]
-        jobs_dir = repo_root / "jobs"
-        if jobs_dir.exists():
-            batches = sorted([d for d in jobs_dir.iterdir() if d.is_dir()], key=lambda x: x.stat().st_mtime, reverse=True)
-            if batches:
-                live_dir = batches[0] / "ocr" / "artifacts" / "live"
-                live_dir.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(cache_path, live_dir / f"{safe_profile}_limit.jpg")
+        latest_batch = _latest_batch_dir()
+        if latest_batch:
+            live_dir = latest_batch / "ocr" / "artifacts" / "live"
+            live_dir.mkdir(parents=True, exist_ok=True)
+            _fastcopy(cache_path, live_dir / f"{safe_profile}_limit.jpg")
     except Exception:
         pass
 
@@ -347,9 +579,12 @@ def _handle_limit_detected(profile_name: str, cache_dir: Path, body_text: str, r
     reset_time = handler.extract_reset_datetime_from_text(body_text or "") if handler else None
     if not reset_time:
         reset_time = datetime.now() + timedelta(minutes=60)
-    screenshot_start = time.time()
+    screenshot_start = time.monotonic_ns()
     screenshot_path, screenshot_size = _write_limit_proof(page, profile_name, cache_dir, run_id)
-    screenshot_ms = int((time.time() - screenshot_start) * 1000)
+    screenshot_ms = _ms_since(screenshot_start)
+    # Every caller returns once the limit is handled; free Chromium before the DB writes
+    with contextlib.suppress(Exception):
+        page.context.close()
     if not screenshot_path:
         return False, None, "LIMIT (no proof)", None, None, None, screenshot_ms
     pause_until = reset_time + timedelta(seconds=180)
@@ -357,19 +592,157 @@ def _handle_limit_detected(profile_name: str, cache_dir: Path, body_text: str, r
     return True, reset_time, None, screenshot_path, pause_until, screenshot_size, screenshot_ms
 
 
+def _finish_limit_check(
+    page,
+    tracking: dict[str, Any],
+    result: dict[str, Any],
+    *,
+    profile_name: str,
+    cache_dir: Path,
+    run_id: str,
+    text: str,
+    method: str,
+    pause_reason: str,
+    check_start: int,
+    response_start: int | None = None,
+) -> dict[str, Any]:
+    """Write the pause and proof for a detected limit and build _check_profile's return value."""
+    limit_start = time.monotonic_ns()
+    ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
+        profile_name, cache_dir, text, run_id, page
+    )
+    tracking["limit_detect_ms"] = _ms_since(limit_start)
+    tracking["limit_detected_method"] = method
+    tracking["limit_banner_text"] = text
+    tracking["screenshot_path"] = screenshot_path
+    tracking["screenshot_size_bytes"] = screenshot_size
+    tracking["screenshot_ms"] = screenshot_ms
+    tracking["pause_written"] = bool(ok)
+    tracking["pause_until"] = pause_until
+    tracking["pause_reason"] = pause_reason
+    tracking["is_limited"] = bool(ok)
+    tracking["reset_time"] = reset_time
+    if ok:
+        result["limited"] = True
+        result["reset_time"] = reset_time
+        tracking["status"] = "LIMIT"
+    else:
+        tracking["status"] = err or "LIMIT_NO_PROOF"
+        tracking["error_message"] = err
+    if response_start is not None:
+        tracking["prompt_response_ms"] = _ms_since(response_start)
+        _record_poll_sample(cache_dir, profile_name, tracking["prompt_response_ms"])
+    tracking["check_duration_ms"] = _ms_since(check_start)
+    result["status"] = tracking["status"]
+    result["duration_ms"] = tracking["check_duration_ms"]
+    return {"tracking": tracking, **result}
+
+
+def _load_poll_samples(cache_dir: Path, profile_name: str) -> list[float]:
+    try:
+        data = json.loads((cache_dir / POLL_HISTORY_FILE).read_text(encoding="utf-8"))
+        return [float(s) for s in data.get(profile_name, [])]
+    except Exception:
+        return []
+
+
+def _record_poll_sample(cache_dir: Path, profile_name: str, detect_ms: int) -> None:
+    path = cache_dir / POLL_HISTORY_FILE
+    with _POLL_HISTORY_LOCK:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(data, dict):
+                data = {}
+        except Exception:
+            data = {}
+        samples = data.get(profile_name) or []
+        samples.append(round(detect_ms / 1000, 3))
+        data[profile_name] = samples[-POLL_HISTORY_SIZE:]
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            tmp_path.replace(path)
+        except Exception:
+            pass
+
+
+def _poll_schedule(samples: list[float]) -> tuple[float, ...]:
+    """Poll times that minimise the expected delay between banner and detection.
+
+    Each past detection time t that falls in (L[i-1], L[i]] costs L[i] - t; the
+    POLL_COUNT polls are placed on a POLL_GRID_S grid by dynamic programming, with
+    the first one no later than POLL_FIRST_MAX_S and the last one at POLL_BUDGET_S.
+    """
+    if len(samples) < POLL_MIN_SAMPLES:
+        return _DEFAULT_POLL_TIMES
+    times = sorted(min(max(t, 0.0), POLL_BUDGET_S) for t in samples)
+    prefix = [0.0]
+    for t in times:
+        prefix.append(prefix[-1] + t)
+
+    def _cost(after: float, until: float) -> float:
+        lo, hi = bisect.bisect_right(times, after), bisect.bisect_right(times, until)
+        return (hi - lo) * until - (prefix[hi] - prefix[lo])
+
+    steps = round((POLL_BUDGET_S - POLL_FIRST_MIN_S) / POLL_GRID_S)
+    grid = [POLL_FIRST_MIN_S + i * POLL_GRID_S for i in range(steps + 1)]
+
+    def _rank(option: tuple[float, tuple[float, ...]]):
+        # Among equal costs stay closest to the default ladder, so samples that say
+        # nothing about a poll (e.g. all at the budget) leave it where it was
+        drift = sum(abs(t - d) for t, d in zip(option[1], _DEFAULT_POLL_TIMES, strict=False))
+        return round(option[0], 6), round(drift, 6)
+
+    # best[j] = (cost, schedule) of the cheapest k polls ending at grid[j], None when
+    # k polls cannot end there; k grows by one per round so schedules stay POLL_COUNT long
+    best = [(_cost(0.0, g), (g,)) if g <= POLL_FIRST_MAX_S else None for g in grid]
+    for _ in range(POLL_COUNT - 1):
+        next_best = []
+        for j in range(len(grid)):
+            chosen = None
+            for i in range(j):
+                if best[i] is None:
+                    continue
+                candidate = (best[i][0] + _cost(grid[i], grid[j]), (*best[i][1], grid[j]))
+                if chosen is None or _rank(candidate) < _rank(chosen):
+                    chosen = candidate
+            next_best.append(chosen)
+        best = next_best
+    return best[-1][1]
+
+
+def _find_limit_text(page) -> str | None:
+    """Return the page text if the Pro limit banner is shown, else None."""
+    return page.evaluate(_LIMIT_TEXT_JS, PRO_LIMIT_TEXT_RE.pattern)
+
+
+def _read_poll_signals(page) -> tuple[str | None, str]:
+    """Limit text (or None) and model label (or "") for one poll after the test prompt."""
+    signals = page.evaluate(
+        _POLL_SIGNALS_JS, [PRO_LIMIT_TEXT_RE.pattern, [_MODEL_BUTTON_RE.pattern, _MODEL_BUTTON_ATTR_SELECTOR]]
+    )
+    return signals["limit_text"], signals["label"] or ""
+
+
 def _find_model_button(page):
+    with _MODEL_BUTTON_CACHE_LOCK:
+        cached = _MODEL_BUTTON_CACHE.get(page)
+    try:
+        if cached is not None and cached.count() > 0:
+            return cached
+    except Exception:
+        pass
+
     candidates = [
         page.locator("button").filter(has_text=_MODEL_BUTTON_RE),
         page.locator("[role='button']").filter(has_text=_MODEL_BUTTON_RE),
-        page.locator("button[aria-label*='model' i]"),
-        page.locator("[role='button'][aria-label*='model' i]"),
-        page.locator("button[aria-label*='modelu' i]"),
-        page.locator("[role='button'][aria-label*='modelu' i]"),
-        page.locator("[data-testid*='model' i]"),
+        page.locator(_MODEL_BUTTON_ATTR_SELECTOR),
     ]
     for loc in candidates:
         try:
             if loc.count() > 0:
+                with _MODEL_BUTTON_CACHE_LOCK:
+                    _MODEL_BUTTON_CACHE[page] = loc
                 return loc
         except Exception:
             continue
@@ -378,42 +751,32 @@ def _find_model_button(page):
 
 def _detect_model_label(page) -> str | None:
     try:
-        loc = _find_model_button(page)
-        if not loc:
-            return None
-        btn = loc.last
-        if btn.count() > 0 and btn.is_visible(timeout=1500):
-            t = btn.inner_text(timeout=1500).strip()
-            if t:
-                return t
-            aria = btn.get_attribute("aria-label")
-            if aria:
-                return aria.strip()
+        return page.evaluate(_DETECT_MODEL_LABEL_JS, [_MODEL_BUTTON_RE.pattern, _MODEL_BUTTON_ATTR_SELECTOR])
     except Exception:
-        pass
-    return None
+        return None
 
 
-def _find_prompt_box(page, timeout_ms: int = 8000):
-    selectors = [
-        'div[contenteditable="true"]',
-        'rich-textarea [contenteditable="true"]',
-        "textarea[placeholder]",
-        ".ql-editor",
-    ]
-    for sel in selectors:
-        try:
-            loc = page.locator(sel).first
-            if loc.is_visible(timeout=timeout_ms):
-                return loc
-        except Exception:
-            continue
-    return None
+def _route_blocked_resources(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
 
 
-def _ensure_pro_model(page) -> str | None:
-    before = _detect_model_label(page) or "unknown"
-    if re.search(_PRO_MODEL_RE, before):
+def _find_prompt_box(page, timeout_ms: int = PROMPT_BOX_TIMEOUT_MS):
+    # is_visible() does not wait, so wait once on all variants together
+    loc = page.locator(_PROMPT_BOX_SELECTOR).filter(visible=True).first
+    try:
+        loc.wait_for(state="visible", timeout=timeout_ms)
+    except Exception:
+        return None
+    return loc
+
+
+def _ensure_pro_model(page, initial_label: str | None = None) -> str | None:
+    before = initial_label or _detect_model_label(page) or "unknown"
+    if _PRO_MODEL_RE.search(before):
         return before
     for _ in range(3):
         try:
@@ -455,11 +818,7 @@ def _read_model_menu_text(page) -> str:
         if loc and loc.count() > 0 and loc.last.is_visible(timeout=1500):
             loc.last.click()
             page.wait_for_timeout(600)
-            menu = page.locator("div[role='menu'], div[role='listbox']").first
-            if menu.count() > 0:
-                txt = menu.inner_text(timeout=1500)
-            else:
-                txt = page.locator("body").inner_text(timeout=1500)
+            txt = page.evaluate(_MODEL_MENU_TEXT_JS)
             try:
                 page.keyboard.press("Escape")
             except Exception:
@@ -471,6 +830,7 @@ def _read_model_menu_text(page) -> str:
 
 
 def _check_profile(
+    p,
     profile_name: str,
     profile_path: Path,
     cache_dir: Path,
@@ -478,8 +838,15 @@ def _check_profile(
     run_id: str,
     quick_mode: bool,
 ):
-    """Check if profile has Pro limit with proof (banner/menu + screenshot)."""
-    check_start = time.time()
+    """Check if profile has Pro limit with proof (banner/menu + screenshot).
+
+    ``p`` is the calling worker's running Playwright instance; only the
+    profile's persistent context is launched here.
+    """
+    check_start = time.monotonic_ns()
+    # main() creates debug_screenshots once per run
+    safe_profile = _UNSAFE_RE.sub("_", profile_name)
+    debug_subdir = cache_dir / "debug_screenshots"
     tracking: dict[str, Any] = {
         "run_id": run_id,
         "profile_name": profile_name,
@@ -554,398 +921,309 @@ def _check_profile(
     proof_error = None
     context = None
 
-
     try:
-        with sync_playwright() as p:
-            browser_start = time.time()
-            context = p.chromium.launch_persistent_context(
-                user_data_dir=str(profile_path),
-                headless=True,
-                args=["--disable-blink-features=AutomationControlled"],
-            )
-            tracking["browser_launch_ms"] = int((time.time() - browser_start) * 1000)
-            tracking["timings_breakdown"]["browser_launch"] = tracking["browser_launch_ms"]
-            page = context.pages[0] if context.pages else context.new_page()
-            nav_start = time.time()
-            page.goto("https://gemini.google.com/app", wait_until="domcontentloaded", timeout=timeout_ms)
-            tracking["navigation_ms"] = int((time.time() - nav_start) * 1000)
-            tracking["timings_breakdown"]["navigation"] = tracking["navigation_ms"]
-            load_start = time.time()
-            time.sleep(1)
-            tracking["page_load_ms"] = int((time.time() - load_start) * 1000)
-            tracking["timings_breakdown"]["page_load"] = tracking["page_load_ms"]
+        browser_start = time.monotonic_ns()
+        context = p.chromium.launch_persistent_context(
+            user_data_dir=str(profile_path),
+            headless=True,
+            args=["--disable-blink-features=AutomationControlled"],
+        )
+        tracking["browser_launch_ms"] = _ms_since(browser_start)
+        if BLOCK_RESOURCES:
+            context.route("**/*", _route_blocked_resources)
+        tracking["timings_breakdown"]["browser_launch"] = tracking["browser_launch_ms"]
+        page = context.pages[0] if context.pages else context.new_page()
+        page.set_default_timeout(DEFAULT_ACTION_TIMEOUT_MS)
+        page.set_default_navigation_timeout(timeout_ms)
+        nav_start = time.monotonic_ns()
+        page.goto("https://gemini.google.com/app", wait_until="domcontentloaded", timeout=timeout_ms)
+        tracking["navigation_ms"] = _ms_since(nav_start)
+        tracking["timings_breakdown"]["navigation"] = tracking["navigation_ms"]
+        # Wait for the chat UI instead of a fixed delay; the result doubles as the login probe
+        load_start = time.monotonic_ns()
+        prompt_probe = _find_prompt_box(page)
+        tracking["page_load_ms"] = _ms_since(load_start)
+        tracking["timings_breakdown"]["page_load"] = tracking["page_load_ms"]
+
+        with contextlib.suppress(Exception):
+            tracking["page_title"] = page.title()
+        with contextlib.suppress(Exception):
+            tracking["page_language"] = page.evaluate("() => document.documentElement.lang || null")
+        with contextlib.suppress(Exception):
+            tracking["browser_user_agent"] = page.evaluate("() => navigator.userAgent")
+        try:
+            viewport = page.viewport_size
+            if viewport:
+                tracking["browser_viewport_width"] = viewport.get("width")
+                tracking["browser_viewport_height"] = viewport.get("height")
+            else:
+                dims = page.evaluate("() => ({w: window.innerWidth, h: window.innerHeight})")
+                tracking["browser_viewport_width"] = dims.get("w")
+                tracking["browser_viewport_height"] = dims.get("h")
+        except Exception:
+            pass
 
+        tracking["chat_opened"] = "gemini.google.com" in page.url
+
+        login_start = time.monotonic_ns()
+        if prompt_probe:
+            tracking["prompt_box_found"] = True
+            tracking["chat_ready"] = True
+            tracking["login_detected"] = False
+            tracking["session_valid"] = True
+        signals = page.evaluate(
+            _PAGE_SIGNALS_JS, [PRO_LIMIT_TEXT_RE.pattern, _LOGIN_RE.pattern, _EMAIL_RE.pattern, RAW_BODY_SAMPLE_CHARS]
+        )
+        tracking["raw_body_text_sample"] = signals["sample"] or None
+
+        if not tracking.get("session_valid"):
+            tracking["login_detected"] = signals["login"]
+            tracking["session_valid"] = not tracking["login_detected"]
+        tracking["login_check_ms"] = _ms_since(login_start)
+        tracking["timings_breakdown"]["login_check"] = tracking["login_check_ms"]
+        if tracking["login_detected"]:
+            tracking["status"] = "SESSION_EXPIRED"
+            tracking["error_message"] = "Login required"
+            tracking["error_stage"] = "session_check"
             try:
-                tracking["page_title"] = page.title()
-            except Exception:
-                pass
-            try:
-                tracking["page_language"] = page.evaluate("() => document.documentElement.lang || null")
-            except Exception:
-                pass
-            try:
-                tracking["browser_user_agent"] = page.evaluate("() => navigator.userAgent")
-            except Exception:
-                pass
-            try:
-                viewport = page.viewport_size
-                if viewport:
-                    tracking["browser_viewport_width"] = viewport.get("width")
-                    tracking["browser_viewport_height"] = viewport.get("height")
-                else:
-                    dims = page.evaluate("() => ({w: window.innerWidth, h: window.innerHeight})")
-                    tracking["browser_viewport_width"] = dims.get("w")
-                    tracking["browser_viewport_height"] = dims.get("h")
+                debug_path = debug_subdir / f"session_expired_{safe_profile}_{run_id}.jpg"
+                debug_size = _save_debug_screenshot(page, debug_path)
+                tracking["screenshot_path"] = str(debug_path)
+                tracking["screenshot_size_bytes"] = debug_size
             except Exception:
                 pass
+            tracking["check_duration_ms"] = _ms_since(check_start)
+            result["status"] = tracking["status"]
+            result["error"] = tracking["status"]
+            result["duration_ms"] = tracking["check_duration_ms"]
+            return {"tracking": tracking, **result}
+
+        if signals["email"]:
+            tracking["account_email"] = signals["email"]
+
+        # Check if limit banner already visible
+        body_text = signals["limit_text"] or ""
+        if body_text:
+            return _finish_limit_check(
+                page,
+                tracking,
+                result,
+                profile_name=profile_name,
+                cache_dir=cache_dir,
+                run_id=run_id,
+                text=body_text,
+                method="banner_initial",
+                pause_reason="limit_banner",
+                check_start=check_start,
+            )
+
+        # Try to switch to Pro and detect limit from menu text
+        model_detect_start = time.monotonic_ns()
+        tracking["model_initial"] = _detect_model_label(page)
+        tracking["model_detect_ms"] = _ms_since(model_detect_start)
+        tracking["timings_breakdown"]["model_detect"] = tracking["model_detect_ms"]
+
+        if not (tracking["model_initial"] and _PRO_MODEL_RE.search(tracking["model_initial"])):
+            tracking["model_switch_needed"] = True
+            switch_start = time.monotonic_ns()
+            for attempt in range(3):
+                tracking["model_switch_attempts"] = attempt + 1
+                # The first attempt starts from the label detected just above
+                tracking["model_after_switch"] = _ensure_pro_model(page, tracking["model_initial"] if attempt == 0 else None)
+                if tracking["model_after_switch"] and _PRO_MODEL_RE.search(tracking["model_after_switch"]):
+                    tracking["model_switch_success"] = True
+                    break
+            tracking["model_switch_ms"] = _ms_since(switch_start)
+            tracking["timings_breakdown"]["model_switch"] = tracking["model_switch_ms"]
+        if not tracking["model_switch_needed"]:
+            tracking["model_final"] = tracking["model_initial"]
+        elif tracking["model_switch_success"]:
+            tracking["model_final"] = tracking["model_after_switch"]
+        else:
+            tracking["model_final"] = _detect_model_label(page) or tracking["model_after_switch"] or tracking["model_initial"]
 
-            tracking["chat_opened"] = "gemini.google.com" in page.url
+        limit_text = _find_limit_text(page)
+        if limit_text:
+            body_text = limit_text
+            return _finish_limit_check(
+                page,
+                tracking,
+                result,
+                profile_name=profile_name,
+                cache_dir=cache_dir,
+                run_id=run_id,
+                text=body_text,
+                method="banner_after_switch",
+                pause_reason="limit_banner",
+                check_start=check_start,
+            )
+        menu_text = _read_model_menu_text(page)
+        tracking["menu_text"] = menu_text or None
+        if menu_text and PRO_LIMIT_TEXT_RE.search(menu_text):
+            return _finish_limit_check(
+                page,
+                tracking,
+                result,
+                profile_name=profile_name,
+                cache_dir=cache_dir,
+                run_id=run_id,
+                text=menu_text,
+                method="menu_text",
+                pause_reason="limit_menu",
+                check_start=check_start,
+            )
+
+        if quick_mode:
+            _clear_pause(cache_dir, profile_name)
+            tracking["pause_cleared"] = True
+            tracking["status"] = "OK"
+            tracking["check_duration_ms"] = _ms_since(check_start)
+            result["status"] = tracking["status"]
+            result["duration_ms"] = tracking["check_duration_ms"]
+            return {"tracking": tracking, **result}
+
+        # Send test prompt to trigger potential limit
+        try:
+            prompt_box = _find_prompt_box(page, timeout_ms=UI_SETTLED_TIMEOUT_MS)
 
-            login_start = time.time()
-            prompt_probe = _find_prompt_box(page, timeout_ms=8000)
-            if prompt_probe:
+            if prompt_box:
                 tracking["prompt_box_found"] = True
                 tracking["chat_ready"] = True
-                tracking["login_detected"] = False
-                tracking["session_valid"] = True
-            body_text = page.locator("body").inner_text(timeout=5000)
-            tracking["raw_body_text_sample"] = body_text[:500] if body_text else None
-
-            login_patterns = [
-                r"Zaloguj się",
-                r"Sign in",
-                r"Log in",
-                r"Create account",
-                r"Załóż konto",
-            ]
-            if not tracking.get("session_valid"):
-                tracking["login_detected"] = any(re.search(p, body_text, re.IGNORECASE) for p in login_patterns)
-                tracking["session_valid"] = not tracking["login_detected"]
-            tracking["login_check_ms"] = int((time.time() - login_start) * 1000)
-            tracking["timings_breakdown"]["login_check"] = tracking["login_check_ms"]
-            if tracking["login_detected"]:
-                tracking["status"] = "SESSION_EXPIRED"
-                tracking["error_message"] = "Login required"
-                tracking["error_stage"] = "session_check"
-                try:
-                    safe_profile = re.sub(r"[^a-zA-Z0-9_.-]+", "_", profile_name)
-                    debug_subdir = cache_dir / "debug_screenshots"
-                    debug_subdir.mkdir(parents=True, exist_ok=True)
-                    debug_path = debug_subdir / f"session_expired_{safe_profile}_{run_id}.jpg"
-                    page.screenshot(path=str(debug_path), type="jpeg", quality=70, full_page=True)
-                    tracking["screenshot_path"] = str(debug_path)
-                    tracking["screenshot_size_bytes"] = debug_path.stat().st_size
-                except Exception:
-                    pass
-                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                result["status"] = tracking["status"]
-                result["error"] = tracking["status"]
-                result["duration_ms"] = tracking["check_duration_ms"]
-                return {"tracking": tracking, **result}
-
-            email_match = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+", body_text)
-            if email_match:
-                tracking["account_email"] = email_match.group(0)
-
-            # Check if limit banner already visible
-            if re.search(PRO_LIMIT_TEXT_RE, body_text or ""):
-                limit_start = time.time()
-                ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                    profile_name, cache_dir, body_text, run_id, page
-                )
-                tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                tracking["limit_detected_method"] = "banner_initial"
-                tracking["limit_banner_text"] = body_text
-                tracking["screenshot_path"] = screenshot_path
-                tracking["screenshot_size_bytes"] = screenshot_size
-                tracking["screenshot_ms"] = screenshot_ms
-                tracking["pause_written"] = bool(ok)
-                tracking["pause_until"] = pause_until
-                tracking["pause_reason"] = "limit_banner"
-                tracking["is_limited"] = bool(ok)
-                tracking["reset_time"] = reset_time
-                if ok:
-                    result["limited"] = True
-                    result["reset_time"] = reset_time
-                    tracking["status"] = "LIMIT"
-                else:
-                    tracking["status"] = err or "LIMIT_NO_PROOF"
-                    tracking["error_message"] = err
-                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                result["status"] = tracking["status"]
-                result["duration_ms"] = tracking["check_duration_ms"]
-                return {"tracking": tracking, **result}
-
-            # Try to switch to Pro and detect limit from menu text
-            model_detect_start = time.time()
-            tracking["model_initial"] = _detect_model_label(page)
-            tracking["model_detect_ms"] = int((time.time() - model_detect_start) * 1000)
-            tracking["timings_breakdown"]["model_detect"] = tracking["model_detect_ms"]
-
-            if not (tracking["model_initial"] and re.search(_PRO_MODEL_RE, tracking["model_initial"])):
-                tracking["model_switch_needed"] = True
-                switch_start = time.time()
-                for attempt in range(3):
-                    tracking["model_switch_attempts"] = attempt + 1
-                    tracking["model_after_switch"] = _ensure_pro_model(page)
-                    if tracking["model_after_switch"] and re.search(_PRO_MODEL_RE, tracking["model_after_switch"]):
-                        tracking["model_switch_success"] = True
-                        break
-                tracking["model_switch_ms"] = int((time.time() - switch_start) * 1000)
-                tracking["timings_breakdown"]["model_switch"] = tracking["model_switch_ms"]
-            tracking["model_final"] = _detect_model_label(page) or tracking["model_after_switch"] or tracking["model_initial"]
-
-            body_text = page.locator("body").inner_text(timeout=5000)
-            if re.search(PRO_LIMIT_TEXT_RE, body_text or ""):
-                limit_start = time.time()
-                ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                    profile_name, cache_dir, body_text, run_id, page
-                )
-                tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                tracking["limit_detected_method"] = "banner_after_switch"
-                tracking["limit_banner_text"] = body_text
-                tracking["screenshot_path"] = screenshot_path
-                tracking["screenshot_size_bytes"] = screenshot_size
-                tracking["screenshot_ms"] = screenshot_ms
-                tracking["pause_written"] = bool(ok)
-                tracking["pause_until"] = pause_until
-                tracking["pause_reason"] = "limit_banner"
-                tracking["is_limited"] = bool(ok)
-                tracking["reset_time"] = reset_time
-                if ok:
-                    result["limited"] = True
-                    result["reset_time"] = reset_time
-                    tracking["status"] = "LIMIT"
-                else:
-                    tracking["status"] = err or "LIMIT_NO_PROOF"
-                    tracking["error_message"] = err
-                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                result["status"] = tracking["status"]
-                result["duration_ms"] = tracking["check_duration_ms"]
-                return {"tracking": tracking, **result}
-            menu_text = _read_model_menu_text(page)
-            tracking["menu_text"] = menu_text or None
-            if menu_text and re.search(PRO_LIMIT_TEXT_RE, menu_text):
-                limit_start = time.time()
-                ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                    profile_name, cache_dir, menu_text, run_id, page
-                )
-                tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                tracking["limit_detected_method"] = "menu_text"
-                tracking["limit_banner_text"] = menu_text
-                tracking["screenshot_path"] = screenshot_path
-                tracking["screenshot_size_bytes"] = screenshot_size
-                tracking["screenshot_ms"] = screenshot_ms
-                tracking["pause_written"] = bool(ok)
-                tracking["pause_until"] = pause_until
-                tracking["pause_reason"] = "limit_menu"
-                tracking["is_limited"] = bool(ok)
-                tracking["reset_time"] = reset_time
-                if ok:
-                    result["limited"] = True
-                    result["reset_time"] = reset_time
-                    tracking["status"] = "LIMIT"
-                else:
-                    tracking["status"] = err or "LIMIT_NO_PROOF"
-                    tracking["error_message"] = err
-                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                result["status"] = tracking["status"]
-                result["duration_ms"] = tracking["check_duration_ms"]
-                return {"tracking": tracking, **result}
-
-            if quick_mode:
-                _clear_pause(cache_dir, profile_name)
-                tracking["pause_cleared"] = True
-                tracking["status"] = "OK"
-                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                result["status"] = tracking["status"]
-                result["duration_ms"] = tracking["check_duration_ms"]
-                return {"tracking": tracking, **result}
-
-            # Send test prompt to trigger potential limit
-            try:
-                prompt_box = _find_prompt_box(page, timeout_ms=2000)
-
-                if prompt_box:
-                    tracking["prompt_box_found"] = True
-                    tracking["chat_ready"] = True
-                    # First try to switch to Pro before sending
-                    _ensure_pro_model(page)
-                    time.sleep(0.5)
-                    prompt_send_start = time.time()
-                    prompt_box.click()
-                    time.sleep(0.3)
-                    prompt_box.fill("1")
-                    time.sleep(0.3)
-                    page.keyboard.press("Enter")
-                    tracking["prompt_sent"] = True
-                    tracking["prompt_send_ms"] = int((time.time() - prompt_send_start) * 1000)
-                    tracking["timings_breakdown"]["prompt_send"] = tracking["prompt_send_ms"]
-
-                    # Multiple retries to detect banner with increasing waits
-                    banner_detected = False
-                    response_start = time.time()
-                    for retry in range(5):
-                        wait_time = 3 + retry * 2  # 3s, 5s, 7s, 9s, 11s
-                        time.sleep(wait_time)
-                        tracking["retry_count"] = retry
-
-                        body_text = page.locator("body").inner_text(timeout=5000)
-
-                        # Check for limit banner after sending prompt
-                        if re.search(PRO_LIMIT_TEXT_RE, body_text or ""):
-                            print(f"  [{profile_name}] Limit banner detected on retry {retry+1}")
-                            limit_start = time.time()
-                            ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                                profile_name, cache_dir, body_text, run_id, page
-                            )
-                            tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                            tracking["limit_detected_method"] = "prompt_response"
-                            tracking["limit_banner_text"] = body_text
-                            tracking["screenshot_path"] = screenshot_path
-                            tracking["screenshot_size_bytes"] = screenshot_size
-                            tracking["screenshot_ms"] = screenshot_ms
-                            tracking["pause_written"] = bool(ok)
-                            tracking["pause_until"] = pause_until
-                            tracking["pause_reason"] = "prompt_limit"
-                            tracking["is_limited"] = bool(ok)
-                            tracking["reset_time"] = reset_time
-                            banner_detected = True
-                            if ok:
-                                result["limited"] = True
-                                result["reset_time"] = reset_time
-                                tracking["status"] = "LIMIT"
-                            else:
-                                tracking["status"] = err or "LIMIT_NO_PROOF"
-                                tracking["error_message"] = err
-                            tracking["prompt_response_ms"] = int((time.time() - response_start) * 1000)
-                            tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                            result["status"] = tracking["status"]
-                            result["duration_ms"] = tracking["check_duration_ms"]
-                            return {"tracking": tracking, **result}
-
-                        # Also check menu text for limit info
-                        menu_text = _read_model_menu_text(page)
-                        tracking["menu_text"] = menu_text or tracking["menu_text"]
-                        if menu_text and re.search(PRO_LIMIT_TEXT_RE, menu_text):
-                            print(f"  [{profile_name}] Limit banner in menu on retry {retry+1}")
-                            limit_start = time.time()
-                            ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                                profile_name, cache_dir, menu_text, run_id, page
-                            )
-                            tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                            tracking["limit_detected_method"] = "menu_text"
-                            tracking["limit_banner_text"] = menu_text
-                            tracking["screenshot_path"] = screenshot_path
-                            tracking["screenshot_size_bytes"] = screenshot_size
-                            tracking["screenshot_ms"] = screenshot_ms
-                            tracking["pause_written"] = bool(ok)
-                            tracking["pause_until"] = pause_until
-                            tracking["pause_reason"] = "limit_menu"
-                            tracking["is_limited"] = bool(ok)
-                            tracking["reset_time"] = reset_time
-                            banner_detected = True
-                            if ok:
-                                result["limited"] = True
-                                result["reset_time"] = reset_time
-                                tracking["status"] = "LIMIT"
-                            else:
-                                tracking["status"] = err or "LIMIT_NO_PROOF"
-                                tracking["error_message"] = err
-                            tracking["prompt_response_ms"] = int((time.time() - response_start) * 1000)
-                            tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                            result["status"] = tracking["status"]
-                            result["duration_ms"] = tracking["check_duration_ms"]
-                            return {"tracking": tracking, **result}
-
-                        # Check if model was forced to Fast/Flash
-                        label = _detect_model_label(page) or ""
-                        is_fast = re.search(_FAST_MODEL_RE, label) and not re.search(_PRO_MODEL_RE, label)
-
-                        if is_fast:
-                            # Model is on Fast - try to switch to Pro again to trigger banner
-                            print(f"  [{profile_name}] Retry {retry+1}: Model on Fast, trying Pro switch...")
-                            _ensure_pro_model(page)
-                            time.sleep(1)
-
-                            # Check body again after Pro switch attempt
-                            body_text = page.locator("body").inner_text(timeout=5000)
-                            if re.search(PRO_LIMIT_TEXT_RE, body_text or ""):
-                                print(f"  [{profile_name}] Limit banner after Pro switch on retry {retry+1}")
-                                limit_start = time.time()
-                                ok, reset_time, err, screenshot_path, pause_until, screenshot_size, screenshot_ms = _handle_limit_detected(
-                                    profile_name, cache_dir, body_text, run_id, page
-                                )
-                                tracking["limit_detect_ms"] = int((time.time() - limit_start) * 1000)
-                                tracking["limit_detected_method"] = "prompt_response"
-                                tracking["limit_banner_text"] = body_text
-                                tracking["screenshot_path"] = screenshot_path
-                                tracking["screenshot_size_bytes"] = screenshot_size
-                                tracking["screenshot_ms"] = screenshot_ms
-                                tracking["pause_written"] = bool(ok)
-                                tracking["pause_until"] = pause_until
-                                tracking["pause_reason"] = "prompt_limit"
-                                tracking["is_limited"] = bool(ok)
-                                tracking["reset_time"] = reset_time
-                                banner_detected = True
-                                if ok:
-                                    result["limited"] = True
-                                    result["reset_time"] = reset_time
-                                    tracking["status"] = "LIMIT"
-                                else:
-                                    tracking["status"] = err or "LIMIT_NO_PROOF"
-                                    tracking["error_message"] = err
-                                tracking["prompt_response_ms"] = int((time.time() - response_start) * 1000)
-                                tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
-                                result["status"] = tracking["status"]
-                                result["duration_ms"] = tracking["check_duration_ms"]
-                                return {"tracking": tracking, **result}
-                        else:
-                            # Still on Pro - no limit, we can stop checking
-                            print(f"  [{profile_name}] Retry {retry+1}: Still on Pro model - OK")
-                            tracking["prompt_response_received"] = True
-                            tracking["prompt_response_ms"] = int((time.time() - response_start) * 1000)
-                            break
-
-                    tracking["total_attempts"] = tracking["retry_count"] + 1
-
-                    # After all retries, check final state
-                    label = _detect_model_label(page) or ""
-                    tracking["model_final"] = label or tracking["model_final"]
-                    if re.search(_FAST_MODEL_RE, label) and not re.search(_PRO_MODEL_RE, label):
-                        # Still on Fast after all retries - no banner appeared
-                        proof_error = "FAST_NO_BANNER"
-                        # Take a screenshot for debugging
+                # First try to switch to Pro before sending
+                _ensure_pro_model(page)
+                time.sleep(0.5)
+                prompt_send_start = time.monotonic_ns()
+                prompt_box.click()
+                time.sleep(0.3)
+                prompt_box.fill("1")
+                time.sleep(0.3)
+                page.keyboard.press("Enter")
+                tracking["prompt_sent"] = True
+                tracking["prompt_send_ms"] = _ms_since(prompt_send_start)
+                tracking["timings_breakdown"]["prompt_send"] = tracking["prompt_send_ms"]
+
+                # Multiple retries to detect banner with increasing waits
+                banner_detected = False
+                response_start = time.monotonic_ns()
+                poll_times = _poll_schedule(_load_poll_samples(cache_dir, profile_name))
+                for retry, poll_at in enumerate(poll_times):
+                    # Poll times are absolute, so time spent checking counts towards the next wait.
+                    # The wait ends early if the banner shows up; a timeout just means the poll is due.
+                    remaining_ms = int(poll_at * 1000) - _ms_since(response_start)
+                    if remaining_ms > 0:
                         try:
-                            safe_profile = re.sub(r"[^a-zA-Z0-9_.-]+", "_", profile_name)
-                            debug_subdir = cache_dir / "debug_screenshots"
-                            debug_subdir.mkdir(parents=True, exist_ok=True)
-                            debug_path = debug_subdir / f"fast_no_banner_{safe_profile}_{run_id}.jpg"
-                            page.screenshot(path=str(debug_path), type="jpeg", quality=70, full_page=True)
-                            print(f"  [{profile_name}] Fast but no banner - screenshot saved: {debug_path}")
+                            page.wait_for_function(
+                                _LIMIT_SHOWN_JS, arg=PRO_LIMIT_TEXT_RE.pattern, polling=POLL_WAKE_INTERVAL_MS, timeout=remaining_ms
+                            )
                         except Exception:
                             pass
-                else:
-                    print(f"  [{profile_name}] Could not find prompt input")
-                    proof_error = "NO_PROMPT"
-                    tracking["prompt_box_found"] = False
-                    tracking["chat_ready"] = False
-                    tracking["error_message"] = "Prompt box not found"
-                    tracking["error_stage"] = "prompt_detection"
+                    tracking["retry_count"] = retry
+
+                    # Check for limit banner after sending prompt; the label is used below
+                    limit_text, label = _read_poll_signals(page)
+                    if limit_text:
+                        body_text = limit_text
+                        print(f"  [{profile_name}] Limit banner detected on retry {retry+1}")
+                        return _finish_limit_check(
+                            page,
+                            tracking,
+                            result,
+                            profile_name=profile_name,
+                            cache_dir=cache_dir,
+                            run_id=run_id,
+                            text=body_text,
+                            method="prompt_response",
+                            pause_reason="prompt_limit",
+                            check_start=check_start,
+                            response_start=response_start,
+                        )
+
+                    # Also check menu text for limit info
+                    menu_text = _read_model_menu_text(page)
+                    tracking["menu_text"] = menu_text or tracking["menu_text"]
+                    if menu_text and PRO_LIMIT_TEXT_RE.search(menu_text):
+                        print(f"  [{profile_name}] Limit banner in menu on retry {retry+1}")
+                        return _finish_limit_check(
+                            page,
+                            tracking,
+                            result,
+                            profile_name=profile_name,
+                            cache_dir=cache_dir,
+                            run_id=run_id,
+                            text=menu_text,
+                            method="menu_text",
+                            pause_reason="limit_menu",
+                            check_start=check_start,
+                            response_start=response_start,
+                        )
+
+                    # Check if model was forced to Fast/Flash
+                    is_fast = _FAST_MODEL_RE.search(label) and not _PRO_MODEL_RE.search(label)
+
+                    if is_fast:
+                        # Model is on Fast - try to switch to Pro again to trigger banner
+                        print(f"  [{profile_name}] Retry {retry+1}: Model on Fast, trying Pro switch...")
+                        _ensure_pro_model(page, label)
+                        time.sleep(1)
+
+                        # Check body again after Pro switch attempt
+                        limit_text = _find_limit_text(page)
+                        if limit_text:
+                            body_text = limit_text
+                            print(f"  [{profile_name}] Limit banner after Pro switch on retry {retry+1}")
+                            return _finish_limit_check(
+                                page,
+                                tracking,
+                                result,
+                                profile_name=profile_name,
+                                cache_dir=cache_dir,
+                                run_id=run_id,
+                                text=body_text,
+                                method="prompt_response",
+                                pause_reason="prompt_limit",
+                                check_start=check_start,
+                                response_start=response_start,
+                            )
+                    else:
+                        # Still on Pro - no limit, we can stop checking
+                        print(f"  [{profile_name}] Retry {retry+1}: Still on Pro model - OK")
+                        tracking["prompt_response_received"] = True
+                        tracking["prompt_response_ms"] = _ms_since(response_start)
+                        break
+
+                tracking["total_attempts"] = tracking["retry_count"] + 1
+
+                # After all retries, check final state
+                label = _detect_model_label(page) or ""
+                tracking["model_final"] = label or tracking["model_final"]
+                if _FAST_MODEL_RE.search(label) and not _PRO_MODEL_RE.search(label):
+                    # Still on Fast after all retries - no banner appeared
+                    proof_error = "FAST_NO_BANNER"
+                    # Take a screenshot for debugging
                     try:
-                        safe_profile = re.sub(r"[^a-zA-Z0-9_.-]+", "_", profile_name)
-                        debug_subdir = cache_dir / "debug_screenshots"
-                        debug_subdir.mkdir(parents=True, exist_ok=True)
-                        debug_path = debug_subdir / f"no_prompt_{safe_profile}_{run_id}.jpg"
-                        page.screenshot(path=str(debug_path), type="jpeg", quality=70, full_page=True)
-                        tracking["screenshot_path"] = str(debug_path)
-                        tracking["screenshot_size_bytes"] = debug_path.stat().st_size
+                        debug_path = debug_subdir / f"fast_no_banner_{safe_profile}_{run_id}.jpg"
+                        _save_debug_screenshot(page, debug_path)
+                        print(f"  [{profile_name}] Fast but no banner - screenshot queued: {debug_path}")
                     except Exception:
                         pass
-            except Exception as e:
-                print(f"  [{profile_name}] Test prompt failed: {e}")
-                tracking["error_message"] = str(e)
-                tracking["error_stage"] = "prompt_send"
+            else:
+                print(f"  [{profile_name}] Could not find prompt input")
+                proof_error = "NO_PROMPT"
+                tracking["prompt_box_found"] = False
+                tracking["chat_ready"] = False
+                tracking["error_message"] = "Prompt box not found"
+                tracking["error_stage"] = "prompt_detection"
+                try:
+                    debug_path = debug_subdir / f"no_prompt_{safe_profile}_{run_id}.jpg"
+                    debug_size = _save_debug_screenshot(page, debug_path)
+                    tracking["screenshot_path"] = str(debug_path)
+                    tracking["screenshot_size_bytes"] = debug_size
+                except Exception:
+                    pass
+        except Exception as e:
+            print(f"  [{profile_name}] Test prompt failed: {e}")
+            tracking["error_message"] = str(e)
+            tracking["error_stage"] = "prompt_send"
 
     except Exception as e:
         print(f"  [{profile_name}] Browser error: {e}")
@@ -959,7 +1237,7 @@ def _check_profile(
         except Exception:
             pass
 
-    if re.search(PRO_LIMIT_TEXT_RE, body_text or ""):
+    if PRO_LIMIT_TEXT_RE.search(body_text or ""):
         # No page handle here; treat as no proof.
         tracking["status"] = "LIMIT_NO_PROOF"
         tracking["error_message"] = "LIMIT_NO_PROOF"
@@ -972,7 +1250,7 @@ def _check_profile(
         tracking["status"] = proof_error
         tracking["error_message"] = proof_error
 
-    tracking["check_duration_ms"] = int((time.time() - check_start) * 1000)
+    tracking["check_duration_ms"] = _ms_since(check_start)
     result["duration_ms"] = tracking["check_duration_ms"]
     if tracking["is_limited"]:
         tracking["status"] = "LIMIT"
@@ -987,19 +1265,70 @@ def _check_profile(
     return {"tracking": tracking, **result}
 
 
+def _check_worker(jobs: queue.SimpleQueue, cache_dir: Path, timeout_ms: int, run_id: str, quick_mode: bool):
+    """Check queued profiles one after another on a single Playwright driver.
+
+    Sync Playwright objects are bound to the thread that started them, so each
+    worker thread owns one driver and reuses it for every profile it takes.
+    Threads only ever wait on the driver or in time.sleep, so --parallel is
+    bounded by Chromium memory, not by the threads themselves.
+    """
+    from playwright.sync_api import sync_playwright  # noqa: PLC0415
+
+    p = None
+    start_error = None
+    try:
+        p = sync_playwright().start()
+    except Exception as e:
+        start_error = e
+    try:
+        while True:
+            try:
+                name, path, future = jobs.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            if p is None:
+                future.set_exception(start_error)
+                continue
+            try:
+                future.set_result(_check_profile(p, name, path, cache_dir, timeout_ms, run_id, quick_mode))
+            except Exception as e:
+                future.set_exception(e)
+    finally:
+        if p is not None:
+            p.stop()
+
+
+@functools.lru_cache(maxsize=64)
+def _status_bucket(status: str | None) -> str:
+    label = str(status or "").upper()
+    if "SKIPPED" in label:
+        return "skipped"
+    if "LIMIT" in label:
+        return "limit"
+    if "OK" in label:
+        return "ok"
+    return "error"
+
+
 def _summarize_results(results: list[tuple[str, str, int]]) -> dict:
-    summary = {"ok": 0, "limit": 0, "error": 0, "skipped": 0, "total": len(results)}
-    for _, status, _ in results:
-        label = str(status or "").upper()
-        if "SKIPPED" in label:
-            summary["skipped"] += 1
-        elif "LIMIT" in label:
-            summary["limit"] += 1
-        elif "OK" in label:
-            summary["ok"] += 1
-        else:
-            summary["error"] += 1
-    return summary
+    buckets = Counter(_status_bucket(status) for _, status, _ in results)
+    return {
+        "ok": buckets["ok"],
+        "limit": buckets["limit"],
+        "error": buckets["error"],
+        "skipped": buckets["skipped"],
+        "total": len(results),
+    }
+
+
+def _dump_json(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
 
 
 def _write_status(
@@ -1016,11 +1345,12 @@ def _write_status(
     total = total if total is not None else len(results)
     summary = _summarize_results(results)
     summary["total"] = total
+    now_iso = datetime.now().isoformat(timespec="seconds")
     payload = {
         "run_id": run_id,
-        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "run_at": now_iso,
         "started_at": started_at,
-        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "updated_at": now_iso,
         "in_progress": in_progress,
         "total": total,
         "completed": len(results),
@@ -1029,36 +1359,28 @@ def _write_status(
         "current_profile": current_profile,
         "results": [{"profile": p, "status": s, "duration_ms": d} for p, s, d in results],
         "source": "local",
-        "worker_host": socket.gethostname(),
+        "worker_host": _HOSTNAME,
     }
     if quick_mode is not None:
         payload["quick_mode"] = bool(quick_mode)
     path = cache_dir / "limit_precheck_status.json"
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Replace atomically: the dashboard polls this file while the run is going
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(_dump_json(payload, indent=True))
+    tmp_path.replace(path)
 
 
 def _append_history(cache_dir: Path, run_id: str, results: list[tuple[str, str, int]]):
-    path = cache_dir / "limit_precheck_history.json"
+    path = cache_dir / HISTORY_FILE
     entry = {
         "run_id": run_id,
         "run_at": datetime.now().isoformat(timespec="seconds"),
         "results": [{"profile": p, "status": s, "duration_ms": d} for p, s, d in results],
         "source": "local",
-        "worker_host": socket.gethostname(),
+        "worker_host": _HOSTNAME,
     }
-    try:
-        if path.exists():
-            data = json.loads(path.read_text(encoding="utf-8"))
-        else:
-            data = []
-        if not isinstance(data, list):
-            data = []
-    except Exception:
-        data = []
-    data.append(entry)
-    if len(data) > 200:
-        data = data[-200:]
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    with path.open("ab") as f:
+        f.write(_dump_json(entry) + b"\n")
 
 
 def main():
@@ -1089,24 +1411,39 @@ def main():
         "--parallel",
         type=int,
         default=int(os.environ.get("OCR_PRECHECK_PARALLEL", "2")),
-        help="Number of profiles to check in parallel.",
+        help="Number of profiles to check in parallel (0 = one per available CPU).",
     )
     parser.add_argument(
         "--quick",
         action="store_true",
         help="Quick mode: only check Pro/menu/banners without sending prompt.",
     )
+    parser.add_argument(
+        "--full-proof",
+        action="store_true",
+        help="Capture the whole page for limit proofs instead of the viewport (debugging).",
+    )
+    parser.add_argument(
+        "--no-block-resources",
+        action="store_true",
+        help="Load images, fonts, media and analytics instead of aborting them.",
+    )
     args = parser.parse_args()
+    global FULL_PAGE_PROOF, BLOCK_RESOURCES  # noqa: PLW0603
+    FULL_PAGE_PROOF = args.full_proof
+    BLOCK_RESOURCES = not args.no_block_resources
 
     base_dir = validate_profiles_dir(args.profiles_dir)
     cache_dir = validate_cache_dir(str(base_dir))
     only = {p.strip() for p in args.profiles.split(",") if p.strip()} or None
+    # Results still queued when the run is cut short are written on exit
+    atexit.register(_flush_checks)
 
     while True:
         # Clear cached status/history to avoid stale results between runs
         try:
             status_path = cache_dir / "limit_precheck_status.json"
-            history_path = cache_dir / "limit_precheck_history.json"
+            history_path = cache_dir / HISTORY_FILE
             if status_path.exists():
                 status_path.unlink()
             if history_path.exists():
@@ -1116,36 +1453,29 @@ def main():
 
         # Clear cached artifacts to avoid stale screenshots between runs
         try:
-            for path in cache_dir.glob("limit_proof_*.jpg"):
-                try:
-                    path.unlink()
-                except Exception:
-                    pass
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if entry.name.startswith("limit_proof_") and entry.name.endswith(".jpg"):
+                        with contextlib.suppress(OSError):
+                            Path(entry.path).unlink()
+            # Only this script writes debug screenshots, so the folder is disposable
             debug_dir = cache_dir / "debug_screenshots"
-            if debug_dir.exists():
-                for path in debug_dir.glob("*.jpg"):
-                    try:
-                        path.unlink()
-                    except Exception:
-                        pass
+            shutil.rmtree(debug_dir, ignore_errors=True)
+            debug_dir.mkdir(parents=True, exist_ok=True)
         except Exception:
             pass
 
         # Remove stale live limit screenshots from the latest batch (if any)
         try:
-            repo_root = Path(__file__).resolve().parents[1]
-            jobs_dir = repo_root / "jobs"
-            if jobs_dir.exists():
-                batches = [d for d in jobs_dir.iterdir() if d.is_dir()]
-                if batches:
-                    latest = max(batches, key=lambda x: x.stat().st_mtime)
-                    live_dir = latest / "ocr" / "artifacts" / "live"
-                    if live_dir.exists():
-                        for path in live_dir.glob("*_limit.jpg"):
-                            try:
-                                path.unlink()
-                            except Exception:
-                                pass
+            latest = _latest_batch_dir()
+            if latest:
+                live_dir = latest / "ocr" / "artifacts" / "live"
+                if live_dir.exists():
+                    for path in live_dir.glob("*_limit.jpg"):
+                        try:
+                            path.unlink()
+                        except Exception:
+                            pass
         except Exception:
             pass
 
@@ -1159,18 +1489,16 @@ def main():
         results = []
         skipped_only = []
 
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-
         result_map = {}
         profile_paths = {name: path for name, path in profiles}
-        max_workers = max(1, int(args.parallel))
+        max_workers = max(1, int(args.parallel) or len(os.sched_getaffinity(0)))
         check_start_times = {}
         check_durations = {}
 
         total_profiles = len(profiles)
 
-        def _progress_results() -> list[tuple[str, str, int]]:
-            return [(name, status, check_durations.get(name, 0)) for name, status in result_map.items()]
+        # Grows by one (name, status, duration) entry per completion for the in-progress snapshots
+        progress_results: list[tuple[str, str, int]] = []
 
         _write_status(
             cache_dir,
@@ -1182,18 +1510,24 @@ def main():
             quick_mode=args.quick,
         )
 
+        jobs: queue.SimpleQueue = queue.SimpleQueue()
+        future_map = {}
+        for name, path in profiles:
+            future = Future()
+            jobs.put((name, path, future))
+            future_map[future] = name
+
+        last_status_write = None
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_map = {
-                executor.submit(_check_profile, name, path, cache_dir, args.timeout_ms, run_id, args.quick): name
-                for name, path in profiles
-            }
+            for _ in range(min(max_workers, total_profiles)):
+                executor.submit(_check_worker, jobs, cache_dir, args.timeout_ms, run_id, args.quick)
             # Track start times
             for future, name in future_map.items():
-                check_start_times[name] = time.time()
+                check_start_times[name] = time.monotonic_ns()
 
             for future in as_completed(future_map):
                 name = future_map[future]
-                check_duration_ms = int((time.time() - check_start_times.get(name, time.time())) * 1000)
+                check_duration_ms = _ms_since(check_start_times.get(name, time.monotonic_ns()))
                 profile_path = str(profile_paths.get(name, ""))
 
                 try:
@@ -1216,11 +1550,11 @@ def main():
                         result_map[name] = "OK"
 
                     check_durations[name] = int(tracking.get("check_duration_ms") or check_duration_ms)
-                    _log_check_to_db(_normalize_check_data(tracking))
+                    _queue_check(tracking)
                 except Exception as e:
                     result_map[name] = f"ERROR {e}"
                     check_durations[name] = check_duration_ms
-                    _log_check_to_db(_normalize_check_data({
+                    _queue_check({
                         "run_id": run_id,
                         "profile_name": name,
                         "profile_path": profile_path,
@@ -1230,17 +1564,24 @@ def main():
                         "error_stage": "thread_result",
                         "check_duration_ms": check_duration_ms,
                         "source_application": "precheck_script",
-                    }))
-                _write_status(
-                    cache_dir,
-                    run_id,
-                    _progress_results(),
-                    in_progress=True,
-                    total=total_profiles,
-                    started_at=run_started_at,
-                    current_profile=name,
-                    quick_mode=args.quick,
-                )
+                    })
+                progress_results.append((name, result_map[name], check_durations[name]))
+                # Completions within STATUS_WRITE_INTERVAL share one snapshot; the final one follows the loop
+                now = time.monotonic()
+                if last_status_write is None or now - last_status_write >= STATUS_WRITE_INTERVAL:
+                    _write_status(
+                        cache_dir,
+                        run_id,
+                        progress_results,
+                        in_progress=True,
+                        total=total_profiles,
+                        started_at=run_started_at,
+                        current_profile=name,
+                        quick_mode=args.quick,
+                    )
+                    last_status_write = now
+
+        _flush_checks()
 
         for name, _ in profiles:
             results.append((name, result_map.get(name, "ERROR no result"), check_durations.get(name, 0)))
@@ -3,17 +3,83 @@
 
 from __future__ import annotations
 
+import argparse
 import os
+import re
 from pathlib import Path
 
 import psycopg2
 
+# Files sent per round-trip with --batch
+MIGRATION_BATCH_SIZE = 10
+
+# Top-level transaction control. A plpgsql BEGIN is never followed by ";", and END is
+# left out because plpgsql blocks close with "END;"
+_TRANSACTION_CONTROL_RE = re.compile(
+    r"^\s*(?:BEGIN|START\s+TRANSACTION|COMMIT|ROLLBACK)(?:\s+(?:WORK|TRANSACTION))?\s*;",
+    re.IGNORECASE | re.MULTILINE,
+)
+
 
 def _get_migration_files(migrations_dir: Path) -> list[Path]:
     return sorted(p for p in migrations_dir.glob("*.sql") if p.is_file())
 
 
+def _manages_own_transaction(sql: str) -> bool:
+    return _TRANSACTION_CONTROL_RE.search(sql) is not None
+
+
+def _execute_chunked(conn, batch: list[tuple[Path, str]]) -> None:
+    """Run batch in one transaction, MIGRATION_BATCH_SIZE files per execute."""
+    if not batch:
+        return
+    with conn.cursor() as cur:
+        for start in range(0, len(batch), MIGRATION_BATCH_SIZE):
+            chunk = batch[start : start + MIGRATION_BATCH_SIZE]
+            print(f"Applying migrations: {', '.join(m.name for m, _ in chunk)}")
+            # Own line for the separator: a file may end in a comment without a newline
+            cur.execute("\n;\n".join(sql for _, sql in chunk))
+    conn.commit()
+
+
+def _apply_batched(conn, migration_files: list[Path]) -> None:
+    """Apply migrations in order, consecutive files sharing one transaction.
+
+    A file with its own top-level BEGIN;/COMMIT; would end the shared
+    transaction early, so the pending batch is committed first and that file
+    runs on its own in autocommit mode.
+    """
+    pending: list[tuple[Path, str]] = []
+    for migration in migration_files:
+        sql = migration.read_text(encoding="utf-8")
+        if not _manages_own_transaction(sql):
+            pending.append((migration, sql))
+            continue
+        _execute_chunked(conn, pending)
+        pending = []
+        print(f"Applying migration (own transaction): {migration.name}")
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+        finally:
+            conn.autocommit = False
+    _execute_chunked(conn, pending)
+
+
 def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help=(
+            f"Apply consecutive migrations in one transaction, {MIGRATION_BATCH_SIZE} files "
+            "per round-trip; a file with its own BEGIN;/COMMIT; runs separately "
+            "(default: one autocommitted execute per file)."
+        ),
+    )
+    args = parser.parse_args()
+
     dsn = os.environ.get("OCR_PG_DSN")
     if not dsn:
         print("Error: OCR_PG_DSN not set")
@@ -32,17 +98,20 @@ def main() -> int:
     print(f"Connecting to DB... ({len(migration_files)} migrations)")
     try:
         conn = psycopg2.connect(dsn)
-        conn.autocommit = True
+        conn.autocommit = not args.batch
     except Exception as exc:
         print(f"Migration failed: {exc}")
         return 1
 
     try:
-        with conn.cursor() as cur:
-            for migration in migration_files:
-                sql = migration.read_text(encoding="utf-8")
-                print(f"Applying migration: {migration.name}")
-                cur.execute(sql)
+        if args.batch:
+            _apply_batched(conn, migration_files)
+        else:
+            with conn.cursor() as cur:
+                for migration in migration_files:
+                    sql = migration.read_text(encoding="utf-8")
+                    print(f"Applying migration: {migration.name}")
+                    cur.execute(sql)
         print("Migrations applied successfully.")
     except Exception as exc:
         print(f"Migration failed: {exc}")
@@ -0,0 +1,59 @@
+"""
+Tests for scripts/farm_conductor.py environ parsing.
+"""
+
+import farm_conductor
+
+
+def _write_environ(tmp_path, entries: list[bytes]) -> str:
+    (tmp_path / "environ").write_bytes(b"\x00".join(entries) + b"\x00")
+    return str(tmp_path)
+
+
+class TestReadProfileSuffix:
+    """Test _read_profile_suffix function."""
+
+    def test_reads_value_from_middle(self, tmp_path):
+        """Should return the value of a variable in the middle of environ."""
+        proc_dir = _write_environ(
+            tmp_path, [b"HOME=/root", b"OCR_PROFILE_SUFFIX=alpha", b"PATH=/usr/bin"]
+        )
+
+        assert farm_conductor._read_profile_suffix(proc_dir) == "alpha"
+
+    def test_reads_first_entry(self, tmp_path):
+        """Should match the first entry, which has no NUL in front of it."""
+        proc_dir = _write_environ(tmp_path, [b"OCR_PROFILE_SUFFIX=first", b"HOME=/root"])
+
+        assert farm_conductor._read_profile_suffix(proc_dir) == "first"
+
+    def test_ignores_key_as_suffix_of_other_variable(self, tmp_path):
+        """Should not match a variable whose name merely ends with the key."""
+        proc_dir = _write_environ(tmp_path, [b"X_OCR_PROFILE_SUFFIX=wrong", b"HOME=/root"])
+
+        assert farm_conductor._read_profile_suffix(proc_dir) is None
+
+    def test_needle_split_across_chunks(self, tmp_path, monkeypatch):
+        """Should find the variable when its name straddles a chunk boundary."""
+        monkeypatch.setattr(farm_conductor, "_ENVIRON_CHUNK", 16)
+        # The leading NUL lands in the first chunk, the rest of the name in the next ones
+        proc_dir = _write_environ(tmp_path, [b"A=0123456789a", b"OCR_PROFILE_SUFFIX=beta"])
+
+        assert farm_conductor._read_profile_suffix(proc_dir) == "beta"
+
+    def test_value_split_across_chunks(self, tmp_path, monkeypatch):
+        """Should read the whole value when it continues into later chunks."""
+        monkeypatch.setattr(farm_conductor, "_ENVIRON_CHUNK", 8)
+        proc_dir = _write_environ(tmp_path, [b"OCR_PROFILE_SUFFIX=long-profile-name", b"Z=1"])
+
+        assert farm_conductor._read_profile_suffix(proc_dir) == "long-profile-name"
+
+    def test_missing_variable(self, tmp_path):
+        """Should return None when the variable is absent."""
+        proc_dir = _write_environ(tmp_path, [b"HOME=/root", b"PATH=/usr/bin"])
+
+        assert farm_conductor._read_profile_suffix(proc_dir) is None
+
+    def test_unreadable_environ(self, tmp_path):
+        """Should return None when environ cannot be read."""
+        assert farm_conductor._read_profile_suffix(str(tmp_path / "gone")) is None
@@ -0,0 +1,68 @@
+"""
+Tests for scripts/farm_monitor_session.py memory sampling.
+"""
+
+import os
+
+import farm_monitor_session
+
+MEMINFO = (
+    b"MemTotal:       16384000 kB\n"
+    b"MemFree:         1024000 kB\n"
+    b"MemAvailable:    8192000 kB\n"
+    b"Buffers:          512000 kB\n"
+)
+
+
+class TestMeminfoKb:
+    """Test _meminfo_kb function."""
+
+    def test_parses_known_keys(self):
+        """Should return the kB value after each key."""
+        assert farm_monitor_session._meminfo_kb(MEMINFO, b"MemTotal:") == 16384000
+        assert farm_monitor_session._meminfo_kb(MEMINFO, b"MemAvailable:") == 8192000
+
+    def test_missing_key(self):
+        """Should return 0 when the key is not in the buffer."""
+        assert farm_monitor_session._meminfo_kb(MEMINFO, b"SwapTotal:") == 0
+
+    def test_reads_entry_between_others(self):
+        """Should stop the value at its own line ending."""
+        assert farm_monitor_session._meminfo_kb(MEMINFO, b"MemFree:") == 1024000
+
+
+class TestSampleSys:
+    """Test _sample_sys function."""
+
+    def test_fills_cache_from_descriptors(self, tmp_path, monkeypatch):
+        """Should derive memory usage and load from the pread buffers."""
+        monkeypatch.setattr(farm_monitor_session, "_sys_cache", {"mem": {}, "load": {}, "ts": 0})
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_bytes(MEMINFO)
+        loadavg = tmp_path / "loadavg"
+        loadavg.write_bytes(b"0.50 0.75 1.00 1/234 5678\n")
+        meminfo_fd = os.open(meminfo, os.O_RDONLY)
+        loadavg_fd = os.open(loadavg, os.O_RDONLY)
+        try:
+            farm_monitor_session._sample_sys(meminfo_fd, loadavg_fd)
+        finally:
+            os.close(meminfo_fd)
+            os.close(loadavg_fd)
+
+        cache = farm_monitor_session._sys_cache
+        assert cache["mem"] == {"mem_used_mb": 8000, "mem_total_mb": 16000, "mem_pct": 50.0}
+        assert cache["load"] == {"load_1m": 0.5, "load_5m": 0.75}
+
+
+class TestGetSystemMetrics:
+    """Test get_system_metrics function."""
+
+    def test_reports_aggregated_profile_memory(self, monkeypatch):
+        """Should report per-profile totals from the scan_proc_once() map."""
+        monkeypatch.setattr(farm_monitor_session, "PROFILES", ["alpha", "beta"])
+        monkeypatch.setattr(farm_monitor_session, "_sys_cache", {"mem": {}, "load": {}, "ts": 0})
+        proc_map = {"alpha": {"pids": [1, 2], "rss_kb": 4096, "pss_kb": 2048}}
+
+        metrics = farm_monitor_session.get_system_metrics(proc_map)
+
+        assert metrics == {"rss_alpha_mb": 4, "pss_alpha_mb": 2}
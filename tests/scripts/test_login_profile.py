@@ -0,0 +1,63 @@
+"""
+Tests for scripts/login_profile.py X11 probing.
+"""
+
+import socket
+import threading
+
+import login_profile
+import pytest
+
+
+def _serve_once(reply: bytes) -> int:
+    """Accept one connection on a free X11-range port, answer with reply, return the port."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    for port in range(6100, 6200):
+        try:
+            server.bind(("127.0.0.1", port))
+            break
+        except OSError:
+            continue
+    else:
+        pytest.skip("no free port in the X11 range")
+    server.listen(1)
+
+    def _handle():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(len(login_profile._X11_SETUP_REQUEST))
+            conn.sendall(reply)
+        server.close()
+
+    threading.Thread(target=_handle, daemon=True).start()
+    return port
+
+
+class TestProbeX11:
+    """Test _probe_x11 function."""
+
+    def test_success_reply(self):
+        """Should return True when the server accepts the setup request."""
+        port = _serve_once(b"\x01\x00\x0b\x00\x00\x00\x00\x00")
+
+        assert login_profile._probe_x11(f"127.0.0.1:{port - 6000}", timeout=1) is True
+
+    def test_auth_failure_reply(self):
+        """Should return None when the server refuses without authorization."""
+        port = _serve_once(b"\x00\x16\x0b\x00\x00\x00\x06\x00")
+
+        assert login_profile._probe_x11(f"127.0.0.1:{port - 6000}", timeout=1) is None
+
+    def test_empty_reply(self):
+        """Should return False when the server closes without answering."""
+        port = _serve_once(b"")
+
+        assert login_profile._probe_x11(f"127.0.0.1:{port - 6000}", timeout=1) is False
+
+    def test_nothing_listening(self):
+        """Should return False when no server is behind the display."""
+        assert login_profile._probe_x11("127.0.0.1:199", timeout=0.2) is False
+
+    def test_invalid_display(self):
+        """Should return False for a display string without a number."""
+        assert login_profile._probe_x11(":abc") is False
@@ -0,0 +1,95 @@
+"""
+Tests for scripts/precheck_limits.py pure helpers.
+"""
+
+import precheck_limits
+
+
+class TestPollSchedule:
+    """Test _poll_schedule function."""
+
+    def test_cold_start_uses_default_ladder(self):
+        """Should fall back to the default ladder below POLL_MIN_SAMPLES."""
+        samples = [10.0] * (precheck_limits.POLL_MIN_SAMPLES - 1)
+
+        assert precheck_limits._poll_schedule(samples) == precheck_limits._DEFAULT_POLL_TIMES
+
+    def test_always_returns_poll_count_polls(self):
+        """Should return exactly POLL_COUNT increasing polls ending at the budget."""
+        for samples in ([0.1] * 5, [40.0] * 6, [4, 6, 10, 20, 30, 12, 7], [20, 21, 22, 23, 24]):
+            schedule = precheck_limits._poll_schedule(samples)
+
+            assert len(schedule) == precheck_limits.POLL_COUNT
+            assert list(schedule) == sorted(set(schedule))
+            assert schedule[-1] == precheck_limits.POLL_BUDGET_S
+
+    def test_first_poll_is_capped(self):
+        """Should keep the first poll within the first-poll window."""
+        for samples in ([40.0] * 6, [20, 21, 22, 23, 24], [4, 6, 10, 20, 30, 12, 7]):
+            first = precheck_limits._poll_schedule(samples)[0]
+
+            assert precheck_limits.POLL_FIRST_MIN_S <= first <= precheck_limits.POLL_FIRST_MAX_S
+
+    def test_late_samples_keep_default_ladder(self):
+        """Should leave the ladder alone when every sample sits at the budget."""
+        assert precheck_limits._poll_schedule([40.0] * 6) == precheck_limits._DEFAULT_POLL_TIMES
+
+    def test_early_samples_poll_at_first_allowed_time(self):
+        """Should poll as early as allowed when detections come before the window."""
+        schedule = precheck_limits._poll_schedule([0.1] * 5)
+
+        assert schedule[0] == precheck_limits.POLL_FIRST_MIN_S
+
+    def test_polls_follow_detection_times(self):
+        """Should place polls right at clustered detection times."""
+        schedule = precheck_limits._poll_schedule([20, 21, 22, 23, 24])
+
+        assert {20.0, 22.0, 24.0} <= set(schedule)
+
+
+class TestStatusBucket:
+    """Test _status_bucket function."""
+
+    def test_classifies_labels(self):
+        """Should map raw status labels to summary buckets."""
+        assert precheck_limits._status_bucket("OK") == "ok"
+        assert precheck_limits._status_bucket("LIMIT until 14:30") == "limit"
+        assert precheck_limits._status_bucket("skipped (no session)") == "skipped"
+        assert precheck_limits._status_bucket("ERROR timeout") == "error"
+
+    def test_empty_status_is_error(self):
+        """Should treat a missing status as an error."""
+        assert precheck_limits._status_bucket(None) == "error"
+        assert precheck_limits._status_bucket("") == "error"
+
+    def test_skipped_wins_over_other_words(self):
+        """Should check SKIPPED before LIMIT and OK."""
+        assert precheck_limits._status_bucket("SKIPPED LIMIT") == "skipped"
+
+
+class TestSummarizeResults:
+    """Test _summarize_results function."""
+
+    def test_counts_each_bucket(self):
+        """Should count results per bucket and in total."""
+        results = [
+            ("a", "OK", 10),
+            ("b", "OK", 12),
+            ("c", "LIMIT until ?", 30),
+            ("d", "SESSION_EXPIRED", 5),
+            ("e", "SKIPPED", 0),
+        ]
+
+        assert precheck_limits._summarize_results(results) == {
+            "ok": 2,
+            "limit": 1,
+            "error": 1,
+            "skipped": 1,
+            "total": 5,
+        }
+
+    def test_empty_results(self):
+        """Should return zero counts for an empty run."""
+        summary = precheck_limits._summarize_results([])
+
+        assert summary == {"ok": 0, "limit": 0, "error": 0, "skipped": 0, "total": 0}
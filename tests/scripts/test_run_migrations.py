@@ -0,0 +1,108 @@
+"""
+Tests for scripts/run_migrations.py batch mode.
+"""
+
+import run_migrations
+
+PLPGSQL_BLOCK = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1) THEN
+        CREATE TABLE t (id int);
+    END IF;
+END;
+$$;
+"""
+
+OWN_TRANSACTION = """
+BEGIN;
+ALTER TABLE t ADD COLUMN mode text;
+COMMIT;
+"""
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.conn.calls.append(("execute", sql, self.conn.autocommit))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = False
+        self.calls = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.calls.append(("commit", None, self.autocommit))
+
+
+class TestManagesOwnTransaction:
+    """Test _manages_own_transaction function."""
+
+    def test_plpgsql_block_is_not_transaction_control(self):
+        """Should ignore plpgsql BEGIN/END inside a DO block."""
+        assert run_migrations._manages_own_transaction(PLPGSQL_BLOCK) is False
+
+    def test_top_level_begin_commit(self):
+        """Should detect a top-level BEGIN;/COMMIT; pair."""
+        assert run_migrations._manages_own_transaction(OWN_TRANSACTION) is True
+
+    def test_transaction_keyword_variants(self):
+        """Should detect lowercase and START TRANSACTION forms."""
+        assert run_migrations._manages_own_transaction("start transaction;\nSELECT 1;") is True
+        assert run_migrations._manages_own_transaction("  begin work ;") is True
+
+
+class TestApplyBatched:
+    """Test _apply_batched function."""
+
+    def test_plain_files_share_one_transaction(self, tmp_path):
+        """Should send plain files in one execute and commit once."""
+        files = []
+        for name in ("001_a.sql", "002_b.sql"):
+            path = tmp_path / name
+            path.write_text(PLPGSQL_BLOCK, encoding="utf-8")
+            files.append(path)
+        conn = FakeConnection()
+
+        run_migrations._apply_batched(conn, files)
+
+        assert [kind for kind, _, _ in conn.calls] == ["execute", "commit"]
+        assert conn.calls[0][1].count("DO $$") == 2
+        assert conn.calls[0][2] is False
+
+    def test_own_transaction_runs_separately_in_order(self, tmp_path):
+        """Should commit the pending batch, then run the file alone in autocommit."""
+        contents = {
+            "001_a.sql": PLPGSQL_BLOCK,
+            "002_b.sql": OWN_TRANSACTION,
+            "003_c.sql": PLPGSQL_BLOCK,
+        }
+        files = []
+        for name, sql in contents.items():
+            path = tmp_path / name
+            path.write_text(sql, encoding="utf-8")
+            files.append(path)
+        conn = FakeConnection()
+
+        run_migrations._apply_batched(conn, files)
+
+        assert conn.calls == [
+            ("execute", PLPGSQL_BLOCK, False),
+            ("commit", None, False),
+            ("execute", OWN_TRANSACTION, True),
+            ("execute", PLPGSQL_BLOCK, False),
+            ("commit", None, False),
+        ]
+        assert conn.autocommit is False